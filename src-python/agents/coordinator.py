@@ -11,7 +11,10 @@ from tools.emailer import EmailTool
 from tools.rag import RagAddTool, RagQueryTool
 from tools.vision import AttachContextTool , ListContextHelpTool
 from tools.tadata import get_tadata_integration
-from tools.integrations import NotionSearchTool, SupabaseQueryTool, ExaSearchTool
+from tools.integrations import (
+    NotionSearchTool, SupabaseQueryTool, ExaSearchTool,
+    NotionSearchManyTool, SupabaseQueryManyTool, ExaSearchManyTool,
+)
 
 logger = logging.getLogger("arrow.router")
 logger.info("🎯 Initializing Coordinator agent...")
@@ -41,7 +44,8 @@ Coordinator = GradientAgent(
         "- Example: 'what's in my Notion' → MUST call notion_notion-search(query='') to list pages\n"
         "- These tools are ALREADY AUTHENTICATED - no credentials needed\n"
         "- NEVER say 'I don't have access' - YOU DO via notion_notion-search and notion_notion-fetch\n"
-        "- Also available: exa_web_search_exa for web searches, supabase_* for database queries\n\n"
+        "- Also available: exa_web_search_exa for web searches, supabase_* for database queries\n"
+        "- Need several searches at once? Use exa_search_many / notion_search_many / supabase_query_many in ONE call\n\n"
         
         "AUTOMATIC CONTEXT RETRIEVAL:\n"
         "- For ANY user question or request, FIRST query the knowledge base with rag_query() to find relevant stored information\n"
@@ -78,11 +82,16 @@ Coordinator = GradientAgent(
         NotionSearchTool,
         SupabaseQueryTool,
         ExaSearchTool,
+        NotionSearchManyTool,
+        SupabaseQueryManyTool,
+        ExaSearchManyTool,
     ],
     sub_agents=[
         SummarizerAgent,
         TerminalCmdAgent,
     ],
+    # The instruction asks for rag_query() first on every request
+    prefetch_tool="rag_query",
 )
 
 # Add Tadata tools if configured
@@ -98,27 +107,17 @@ logger.info(f"   Tools: {len(Coordinator.tools)} tool(s)")
 logger.info(f"   Sub-agents: {len(Coordinator.sub_agents)} sub-agent(s)")
 print(f"[DEBUG ROUTER] Coordinator initialized with {len(Coordinator.tools)} tools and {len(Coordinator.sub_agents)} sub-agents")
 
-# Print all tools for debugging
-print("\n" + "="*60)
-print("🔧 COORDINATOR TOOLS:")
-print("="*60)
-for idx, tool in enumerate(Coordinator.tools, 1):
-    if isinstance(tool, tuple):
-        server_name, tool_info = tool
-        tool_name = tool_info.get('name', 'unknown') if isinstance(tool_info, dict) else str(tool_info)
-        print(f"  {idx}. [{server_name}] {tool_name} (Tadata MCP)")
-    else:
-        # Try to get the tool name from various attributes
-        tool_name = None
-        if hasattr(tool, 'name'):
-            tool_name = tool.name
-        elif hasattr(tool, '_name'):
-            tool_name = tool._name
-        elif hasattr(tool, 'function_name'):
-            tool_name = tool.function_name
-        elif hasattr(tool, '__name__'):
-            tool_name = tool.__name__
+# Print all tools for debugging (opt-in, keeps import fast)
+if os.environ.get("ARROW_DEBUG_TOOLS"):
+    print("\n" + "="*60)
+    print("🔧 COORDINATOR TOOLS:")
+    print("="*60)
+    for idx, tool in enumerate(Coordinator.tools, 1):
+        if isinstance(tool, tuple):
+            server_name, tool_info = tool
+            tool_name = tool_info.get('name', 'unknown') if isinstance(tool_info, dict) else str(tool_info)
+            print(f"  {idx}. [{server_name}] {tool_name} (Tadata MCP)")
         else:
-            tool_name = type(tool).__name__
-        print(f"  {idx}. {tool_name}")
-print("="*60 + "\n")
+            tool_name = getattr(tool, 'name', None) or type(tool).__name__
+            print(f"  {idx}. {tool_name}")
+    print("="*60 + "\n")
@@ -6,26 +6,79 @@ Reads config from the settings_manager (cloudflare category).
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import AsyncIterator, Any, Optional
+import math
+import time
+import zlib
+from collections import OrderedDict
+from typing import AsyncIterator, Any, Awaitable, Callable, Optional
 
 import httpx
+import orjson
 
 from utils.settings_manager import get_settings_manager
 
 logger = logging.getLogger("pointer.cloudflare")
 
+# Shared HTTP client — reuses keep-alive connections to the Worker across calls
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+
+# Non-streaming memory calls get a shorter read timeout than chat streams
+_MEMORY_TIMEOUT = httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared Worker client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            # Bounded connect/write/pool waits so a slow peer can't stall pool slots
+            timeout=httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"Accept-Encoding": "gzip, br"},
+            http2=True,
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared Worker client (called on app shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+# Cached config and derived request values; rebuilt by invalidate_cloudflare_config()
+_CFG: dict[str, Any] | None = None
+_HEADERS: dict[str, str] | None = None
+_BASE_URL: str | None = None
+
 
 def _get_config() -> dict[str, Any]:
-    """Read cloudflare settings from the settings DB."""
-    sm = get_settings_manager()
-    return {
-        "enabled": sm.get("cloudflare", "enabled", default=False),
-        "endpoint": sm.get("cloudflare", "endpoint", default=""),
-        "api_token": sm.get("cloudflare", "api_token", default="", decrypt=True),
-        "default_model": sm.get("cloudflare", "default_model", default="@cf/meta/llama-3.3-70b-instruct-fp8-fast"),
-        "rag_top_k": sm.get("cloudflare", "rag_top_k", default=5),
-    }
+    """Read cloudflare settings from the settings DB (cached until invalidated)."""
+    global _CFG
+    if _CFG is None:
+        sm = get_settings_manager()
+        _CFG = {
+            "enabled": sm.get("cloudflare", "enabled", default=False),
+            "endpoint": sm.get("cloudflare", "endpoint", default=""),
+            "api_token": sm.get("cloudflare", "api_token", default="", decrypt=True),
+            "default_model": sm.get("cloudflare", "default_model", default="@cf/meta/llama-3.3-70b-instruct-fp8-fast"),
+            "rag_top_k": sm.get("cloudflare", "rag_top_k", default=5),
+            "search_cache_threshold": sm.get("cloudflare", "search_cache_threshold", default=0.05),
+        }
+    return _CFG
+
+
+def invalidate_cloudflare_config() -> None:
+    """Forget the cached config so the next call re-reads the settings DB."""
+    global _CFG, _HEADERS, _BASE_URL
+    _CFG = None
+    _HEADERS = None
+    _BASE_URL = None
 
 
 def is_enabled() -> bool:
@@ -35,15 +88,21 @@ def is_enabled() -> bool:
 
 
 def _headers() -> dict[str, str]:
-    cfg = _get_config()
-    return {
-        "Authorization": f"Bearer {cfg['api_token']}",
-        "Content-Type": "application/json",
-    }
+    global _HEADERS
+    if _HEADERS is None:
+        cfg = _get_config()
+        _HEADERS = {
+            "Authorization": f"Bearer {cfg['api_token']}",
+            "Content-Type": "application/json",
+        }
+    return _HEADERS
 
 
 def _base_url() -> str:
-    return _get_config()["endpoint"].rstrip("/")
+    global _BASE_URL
+    if _BASE_URL is None:
+        _BASE_URL = _get_config()["endpoint"].rstrip("/")
+    return _BASE_URL
 
 
 # ──────────────────────────────── Chat ───────────────────────────────────────
@@ -62,15 +121,133 @@ async def stream_chat(
     if system:
         payload["system"] = system
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        async with client.stream("POST", url, json=payload, headers=_headers()) as resp:
-            resp.raise_for_status()
-            async for line in resp.aiter_lines():
-                if line.startswith("data: "):
-                    data = line[6:]
-                    if data.strip() == "[DONE]":
-                        return
-                    yield data
+    client = _get_client()
+    async with client.stream("POST", url, content=orjson.dumps(payload), headers=_headers()) as resp:
+        resp.raise_for_status()
+        # Parse SSE at the byte level: only `data:` payloads are ever decoded
+        buffer = bytearray()
+        async for chunk in resp.aiter_bytes(8192):
+            buffer += chunk
+            start = 0
+            while (end := buffer.find(b"\n", start)) != -1:
+                line = bytes(buffer[start:end]).rstrip(b"\r")
+                start = end + 1
+                if not line.startswith(b"data: "):
+                    continue
+                data = line[6:]
+                if data.strip() == b"[DONE]":
+                    return
+                yield data.decode("utf-8")
+            del buffer[:start]
+
+
+# ───────────────────────────── Search Cache ──────────────────────────────────
+#
+# Approximate cache in front of search_memory: near-duplicate queries (cosine
+# distance of their trigram sketches <= threshold) reuse the previous matches
+# instead of paying another Worker round-trip.
+
+_SEARCH_CACHE_SIZE = 256
+_SEARCH_CACHE_TTL = 300.0  # seconds; the Worker's index changes underneath us
+_SKETCH_DIM = 128
+
+# (normalized query, top_k) -> (query sketch, matches, stored_at), kept in LRU order
+_SEARCH_CACHE: OrderedDict[
+    tuple[str, int], tuple[tuple[float, ...], list[dict[str, Any]], float]
+] = OrderedDict()
+
+
+def _query_sketch(text: str) -> tuple[float, ...]:
+    """Hash character trigrams of `text` into a unit-length 128-dim sketch."""
+    vec = [0.0] * _SKETCH_DIM
+    padded = f"  {text} "
+    for i in range(len(padded) - 2):
+        vec[zlib.crc32(padded[i:i + 3].encode()) % _SKETCH_DIM] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm == 0:
+        return tuple(vec)
+    return tuple(v / norm for v in vec)
+
+
+def _cache_lookup(
+    key: tuple[str, int],
+    sketch: tuple[float, ...],
+    threshold: float,
+) -> Optional[list[dict[str, Any]]]:
+    """Return cached matches for an exact or near-duplicate query, else None."""
+    _expire_search_cache()
+
+    entry = _SEARCH_CACHE.get(key)
+    if entry is not None:
+        _SEARCH_CACHE.move_to_end(key)
+        return entry[1]
+
+    best_key = None
+    min_dist = math.inf
+    for cached_key, (cached_sketch, _, _) in _SEARCH_CACHE.items():
+        if cached_key[1] != key[1]:
+            continue
+        dist = 1.0 - sum(a * b for a, b in zip(sketch, cached_sketch))
+        if dist < min_dist:
+            best_key, min_dist = cached_key, dist
+
+    if best_key is not None and min_dist <= threshold:
+        _SEARCH_CACHE.move_to_end(best_key)
+        return _SEARCH_CACHE[best_key][1]
+    return None
+
+
+def _cache_store(
+    key: tuple[str, int],
+    sketch: tuple[float, ...],
+    matches: list[dict[str, Any]],
+) -> None:
+    _SEARCH_CACHE[key] = (sketch, matches, time.monotonic())
+    _SEARCH_CACHE.move_to_end(key)
+    while len(_SEARCH_CACHE) > _SEARCH_CACHE_SIZE:
+        _SEARCH_CACHE.popitem(last=False)
+
+
+def _expire_search_cache() -> None:
+    """Drop entries older than _SEARCH_CACHE_TTL."""
+    cutoff = time.monotonic() - _SEARCH_CACHE_TTL
+    stale = [k for k, (_, _, stored_at) in _SEARCH_CACHE.items() if stored_at < cutoff]
+    for k in stale:
+        del _SEARCH_CACHE[k]
+
+
+def clear_search_cache() -> None:
+    """Drop all cached search results (e.g. after new memories are ingested)."""
+    _SEARCH_CACHE.clear()
+
+
+# ───────────────────────────── Single-flight ─────────────────────────────────
+#
+# Concurrent identical requests share one in-flight Worker call.
+
+_INFLIGHT: dict[tuple[Any, ...], asyncio.Task] = {}
+
+
+async def _single_flight(key: tuple[Any, ...], fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run `fetch` once per key; concurrent callers with the same key await its result.
+
+    The fetch runs in its own task and every caller awaits it through a shield, so a
+    cancelled caller (e.g. a disconnected client) doesn't cancel it for the others.
+    """
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(fetch())
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda done: _finish_flight(key, done))
+    return await asyncio.shield(task)
+
+
+def _finish_flight(key: tuple[Any, ...], task: asyncio.Task) -> None:
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved so a fetch every caller gave up on doesn't warn
 
 
 # ──────────────────────────────── Memory ─────────────────────────────────────
@@ -88,11 +265,16 @@ async def ingest_memory(
     payload: dict[str, Any] = {"text": text}
     if metadata:
         payload["metadata"] = metadata
+    body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(url, json=payload, headers=_headers())
+    async def fetch() -> dict[str, Any]:
+        resp = await _get_client().post(url, content=body, headers=_headers(), timeout=_MEMORY_TIMEOUT)
         resp.raise_for_status()
-        return resp.json()
+        # New memories can change the answer to any cached query
+        clear_search_cache()
+        return orjson.loads(resp.content)
+
+    return await _single_flight(("ingest", hashlib.sha256(body).hexdigest()), fetch)
 
 
 async def search_memory(
@@ -105,17 +287,30 @@ async def search_memory(
     Returns a list of match dicts: [{"id": ..., "score": ..., "text": ..., "metadata": ...}]
     """
     cfg = _get_config()
+    top_k = top_k or cfg["rag_top_k"]
+    key = (query.strip().lower(), top_k)
+    sketch = _query_sketch(key[0])
+
+    cached = _cache_lookup(key, sketch, float(cfg["search_cache_threshold"]))
+    if cached is not None:
+        logger.debug("Memory search cache hit for %r", query[:50])
+        return cached
+
     url = f"{_base_url()}/api/memory/search"
     payload: dict[str, Any] = {
         "query": query,
-        "top_k": top_k or cfg["rag_top_k"],
+        "top_k": top_k,
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(url, json=payload, headers=_headers())
+    async def fetch() -> list[dict[str, Any]]:
+        resp = await _get_client().post(url, content=orjson.dumps(payload), headers=_headers(), timeout=_MEMORY_TIMEOUT)
         resp.raise_for_status()
-        data = resp.json()
-        return data.get("matches", [])
+        data = orjson.loads(resp.content)
+        matches = data.get("matches", [])
+        _cache_store(key, sketch, matches)
+        return matches
+
+    return await _single_flight(("search", *key), fetch)
 
 
 # ──────────────────────────── Context Builder ──────────────────────────────
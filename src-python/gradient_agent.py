@@ -5,14 +5,70 @@ Replaces Google ADK with direct HTTP API calls to Gradient AI
 
 import os
 import json
+import hashlib
+import inspect
 import logging
-from typing import Any, Dict, List, Optional, Callable, AsyncGenerator
+import typing
+from typing import Any, Dict, List, Optional, Callable, AsyncGenerator, Tuple
 from dataclasses import dataclass, field
 import asyncio
 import httpx
+import orjson
+from cachetools import TTLCache
 
 logger = logging.getLogger("arrow.gradient_agent")
 
+# Max number of tool calls from a single {"tools": [...]} batch that run concurrently.
+# Defaults to 1 (sequential) to keep the original behavior.
+TOOL_CONCURRENCY_LIMIT = max(1, int(os.environ.get("TOOL_CONCURRENCY_LIMIT", "1")))
+
+# Start an agent's prefetch_tool with the user message alongside the first model call
+# and reuse the result if the model asks for it. Off by default.
+SPECULATIVE_TOOL_PREFETCH = os.environ.get("SPECULATIVE_TOOL_PREFETCH", "0") == "1"
+
+# Reuse completed model replies for identical requests (same model, tools and messages)
+# for MODEL_RESPONSE_CACHE_TTL seconds. Off by default: replies to time-dependent
+# questions would go stale.
+MODEL_RESPONSE_CACHE = os.environ.get("MODEL_RESPONSE_CACHE", "0") == "1"
+
+# Completed model replies keyed on a hash of (model, max_tokens, tools generation, messages)
+_RESPONSE_CACHE: TTLCache = TTLCache(
+    maxsize=1024,
+    ttl=float(os.environ.get("MODEL_RESPONSE_CACHE_TTL", "600"))
+)
+
+# Number of past user/assistant exchanges from the session sent with each request
+HISTORY_TURNS = max(0, int(os.environ.get("AGENT_HISTORY_TURNS", "10")))
+
+# Sessions idle for AGENT_SESSION_TTL seconds are dropped; at most AGENT_SESSION_MAX are kept
+SESSION_TTL = float(os.environ.get("AGENT_SESSION_TTL", "3600"))
+SESSION_MAX = max(1, int(os.environ.get("AGENT_SESSION_MAX", "1024")))
+
+# Shared HTTP client so every agent turn reuses pooled keep-alive connections
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client used for all model API calls"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            # Bounded connect/write/pool waits so a slow peer can't stall pool slots
+            timeout=httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"Accept-Encoding": "gzip, br"},
+            http2=True,
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client():
+    """Close the shared HTTP client (call on application shutdown)"""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
 
 @dataclass
 class Message:
@@ -36,16 +92,20 @@ class Session:
         """Add a message to the session history"""
         self.history.append(Message(role=role, content=content))
     
-    def get_messages_dict(self) -> List[Dict[str, str]]:
-        """Get all messages as dictionaries for API calls"""
-        return [msg.to_dict() for msg in self.history]
+    def get_messages_dict(self, max_turns: Optional[int] = None) -> List[Dict[str, str]]:
+        """Get messages as dictionaries for API calls, optionally only the last `max_turns` exchanges"""
+        history = self.history
+        if max_turns is not None:
+            # Each exchange is a user + assistant message pair
+            history = history[-2 * max_turns:] if max_turns else []
+        return [msg.to_dict() for msg in history]
 
 
 class SessionService:
-    """Manages conversation sessions"""
+    """Manages conversation sessions (bounded: idle and least-recent sessions are evicted)"""
     
     def __init__(self):
-        self.sessions: Dict[str, Session] = {}
+        self.sessions: TTLCache = TTLCache(maxsize=SESSION_MAX, ttl=SESSION_TTL)
     
     def create_session(self, app_name: str, user_id: str, session_id: str) -> Session:
         """Create a new session"""
@@ -57,16 +117,23 @@ class SessionService:
     def get_session(self, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
         """Get an existing session"""
         key = f"{app_name}:{user_id}:{session_id}"
-        return self.sessions.get(key)
+        session = self.sessions.get(key)
+        if session is not None:
+            # Re-inserting restarts the TTL, so only idle sessions expire
+            self.sessions[key] = session
+        return session
     
     def delete_session(self, app_name: str, user_id: str, session_id: str):
         """Delete a session"""
         key = f"{app_name}:{user_id}:{session_id}"
-        if key in self.sessions:
-            del self.sessions[key]
+        if self.sessions.pop(key, None) is not None:
             logger.info(f"Deleted session: {session_id}")
 
 
+# Default session store shared by agents that aren't given their own
+_DEFAULT_SESSION_SERVICE = SessionService()
+
+
 class Tool:
     """Base class for tools that agents can use"""
     
@@ -74,19 +141,23 @@ class Tool:
         self.name = name
         self.description = description
         self.func = func
-        self._is_async = asyncio.iscoroutinefunction(func)
+        self._is_async = inspect.iscoroutinefunction(func)
+        # Pick the dispatch path once instead of branching on every call
+        self.execute = self._execute_async if self._is_async else self._execute_sync
+        # Tools are immutable after construction, so build the schema once
+        self._function_def = self._build_function_definition()
+        self._fn_def_json = orjson.dumps(self._function_def).decode()
     
-    async def execute(self, **kwargs) -> Any:
-        """Execute the tool function"""
-        if self._is_async:
-            return await self.func(**kwargs)
-        else:
-            return self.func(**kwargs)
+    async def _execute_async(self, **kwargs) -> Any:
+        """Execute an async tool function"""
+        return await self.func(**kwargs)
     
-    def to_function_definition(self) -> Dict[str, Any]:
-        """Convert tool to function definition for Gradient AI"""
-        # Extract parameter info from function signature
-        import inspect
+    async def _execute_sync(self, **kwargs) -> Any:
+        """Execute a sync tool function in a worker thread so blocking I/O doesn't stall the event loop"""
+        return await asyncio.to_thread(self.func, **kwargs)
+    
+    def _build_function_definition(self) -> Dict[str, Any]:
+        """Build the function definition from the wrapped function's signature"""
         sig = inspect.signature(self.func)
         parameters = {
             "type": "object",
@@ -105,11 +176,15 @@ class Tool:
                     param_type = "boolean"
                 elif param.annotation == float:
                     param_type = "number"
+                elif param.annotation is list or typing.get_origin(param.annotation) is list:
+                    param_type = "array"
             
             parameters["properties"][param_name] = {
                 "type": param_type,
                 "description": f"Parameter {param_name}"
             }
+            if param_type == "array":
+                parameters["properties"][param_name]["items"] = {"type": "string"}
             
             if param.default == inspect.Parameter.empty:
                 parameters["required"].append(param_name)
@@ -119,6 +194,32 @@ class Tool:
             "description": self.description,
             "parameters": parameters
         }
+    
+    def to_function_definition(self) -> Dict[str, Any]:
+        """Convert tool to function definition for Gradient AI"""
+        return self._function_def
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _parse_action(response: str) -> Optional[Dict[str, Any]]:
+    """Parse a tool call / delegation JSON object from a model reply, or None for plain prose"""
+    stripped = response.lstrip()
+    # Cheap sniff first - most replies are prose and never reach the JSON parser
+    if not stripped.startswith("{"):
+        return None
+    if '"tool' not in stripped and '"agent"' not in stripped:
+        return None
+    try:
+        data = orjson.loads(stripped)
+    except orjson.JSONDecodeError:
+        try:
+            # raw_decode tolerates trailing prose after the JSON object
+            data, _ = _JSON_DECODER.raw_decode(stripped)
+        except json.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
 
 
 class GradientAgent:
@@ -132,6 +233,9 @@ class GradientAgent:
         instruction: str = "",
         tools: Optional[List[Tool]] = None,
         sub_agents: Optional[List['GradientAgent']] = None,
+        prefetch_tool: Optional[str] = None,
+        session_service: Optional[SessionService] = None,
+        native_tools: bool = True,
     ):
         self.name = name
         self.model = model
@@ -139,6 +243,11 @@ class GradientAgent:
         self.instruction = instruction
         self.tools = tools or []
         self.sub_agents = sub_agents or []
+        self.prefetch_tool = prefetch_tool
+        self.session_service = session_service or _DEFAULT_SESSION_SERVICE
+        # Advertise tools via the provider's function-calling API; set False for
+        # models without tool support (the JSON reply protocol still works)
+        self.native_tools = native_tools
         
         # Initialize API configuration based on model
         if model.startswith("anthropic-") or model.startswith("claude-"):
@@ -160,95 +269,229 @@ class GradientAgent:
         if not self.api_key:
             raise ValueError("API key must be set in environment variables (ANTHROPIC_API_KEY, GRADIENT_API_KEY, or GOOGLE_API_KEY)")
         
-        # Build tools map for quick lookup
+        # Build tools and sub-agents maps for quick lookup
         self.tools_map = {tool.name: tool for tool in self.tools}
+        self.sub_agents_map = {agent.name: agent for agent in self.sub_agents}
+        
+        # System prompt only depends on instruction/tools/sub-agents, so build it once
+        self._system_prompt = self._build_system_prompt_impl()
+        self._tool_schemas = self._build_tool_schemas()
+        # Bumped whenever tools change so cached replies from the old tool set are not reused
+        self._tools_generation = 0
         
         logger.info(f"Initialized Gradient agent: {name} with model {model}")
         logger.info(f"  Tools: {len(self.tools)}")
         logger.info(f"  Sub-agents: {len(self.sub_agents)}")
     
-    def _build_system_prompt(self) -> str:
+    def _build_system_prompt_impl(self) -> str:
         """Build the system prompt with instructions and tool descriptions"""
-        prompt = f"{self.instruction}\n\n"
+        parts = [f"{self.instruction}\n\n"]
         
         if self.tools:
-            prompt += "AVAILABLE TOOLS:\n"
-            for tool in self.tools:
-                prompt += f"- {tool.name}: {tool.description}\n"
-            prompt += "\n"
+            parts.append("AVAILABLE TOOLS:\n")
+            parts.extend(f"- {tool.name}: {tool.description}\n" for tool in self.tools)
+            parts.append("\n")
         
         if self.sub_agents:
-            prompt += "AVAILABLE SUB-AGENTS:\n"
-            for agent in self.sub_agents:
-                prompt += f"- {agent.name}: {agent.description}\n"
-            prompt += "\n"
+            parts.append("AVAILABLE SUB-AGENTS:\n")
+            parts.extend(f"- {agent.name}: {agent.description}\n" for agent in self.sub_agents)
+            parts.append("\n")
         
-        return prompt
+        return "".join(parts)
+    
+    def _build_system_prompt(self) -> str:
+        """Return the cached system prompt"""
+        return self._system_prompt
+    
+    def invalidate_system_prompt(self):
+        """Rebuild the tool lookup and cached system prompt after tools change at runtime"""
+        self.tools_map = {tool.name: tool for tool in self.tools}
+        self._system_prompt = self._build_system_prompt_impl()
+        self._tool_schemas = self._build_tool_schemas()
+        self._tools_generation += 1
     
-    async def _call_gradient(self, messages: List[Dict[str, str]], max_tokens: int = 2000) -> str:
-        """Make a call to Gradient AI API using HTTP"""
+    def _build_tool_schemas(self) -> List[Dict[str, Any]]:
+        """Build the provider-specific tool list sent with each request"""
+        if not self.native_tools:
+            return []
+        if self.is_anthropic:
+            return [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "input_schema": tool.to_function_definition()["parameters"]
+                }
+                for tool in self.tools
+            ]
+        return [
+            {"type": "function", "function": tool.to_function_definition()}
+            for tool in self.tools
+        ]
+    
+    async def _call_gradient(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: int = 2000
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Make a call to Gradient AI API using HTTP
+        Returns the reply text and any native tool calls as [{"id", "tool", "arguments"}]
+        With MODEL_RESPONSE_CACHE on, identical requests within the TTL are served from _RESPONSE_CACHE
+        """
+        cache_key = None
+        if MODEL_RESPONSE_CACHE:
+            cache_key = hashlib.blake2b(
+                orjson.dumps([self.model, max_tokens, self._tools_generation, messages])
+            ).digest()
+            cached = _RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                logger.info("Model response cache hit")
+                return cached
+        
         try:
-            async with httpx.AsyncClient() as client:
-                if self.is_anthropic:
-                    # Anthropic API format
-                    system_message = None
-                    anthropic_messages = []
-                    
-                    for msg in messages:
-                        if msg["role"] == "system":
-                            system_message = msg["content"]
-                        else:
-                            anthropic_messages.append({
-                                "role": msg["role"],
-                                "content": msg["content"]
-                            })
-                    
-                    request_body = {
-                        "model": self.model,
-                        "messages": anthropic_messages,
-                        "max_tokens": max_tokens
-                    }
-                    
-                    if system_message:
-                        request_body["system"] = system_message
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers={
-                            "Content-Type": "application/json",
-                            "x-api-key": self.api_key,
-                            "anthropic-version": "2023-06-01"
-                        },
-                        json=request_body,
-                        timeout=60.0
-                    )
-                else:
-                    # Gradient AI format
-                    response = await client.post(
-                        self.api_url,
-                        headers={
-                            "Content-Type": "application/json",
-                            "Authorization": f"Bearer {self.api_key}"
-                        },
-                        json={
-                            "model": self.model,
-                            "messages": messages,
-                            "max_tokens": max_tokens
-                        },
-                        timeout=60.0
-                    )
+            client = _get_client()
+            if self.is_anthropic:
+                # Anthropic API format
+                system_message = None
+                anthropic_messages = []
+                
+                for msg in messages:
+                    if msg["role"] == "system":
+                        system_message = msg["content"]
+                    else:
+                        anthropic_messages.append({
+                            "role": msg["role"],
+                            "content": msg["content"]
+                        })
+                
+                request_body = {
+                    "model": self.model,
+                    "messages": anthropic_messages,
+                    "max_tokens": max_tokens
+                }
                 
-                response.raise_for_status()
-                result = response.json()
+                if system_message:
+                    request_body["system"] = system_message
+                if self._tool_schemas:
+                    request_body["tools"] = self._tool_schemas
                 
-                if self.is_anthropic:
-                    return result["content"][0]["text"]
-                else:
-                    return result["choices"][0]["message"]["content"]
+                response = await client.post(
+                    self.api_url,
+                    headers={
+                        "Content-Type": "application/json",
+                        "x-api-key": self.api_key,
+                        "anthropic-version": "2023-06-01"
+                    },
+                    content=orjson.dumps(request_body)
+                )
+            else:
+                # Gradient AI format
+                request_body = {
+                    "model": self.model,
+                    "messages": messages,
+                    "max_tokens": max_tokens
+                }
+                if self._tool_schemas:
+                    request_body["tools"] = self._tool_schemas
+                
+                response = await client.post(
+                    self.api_url,
+                    headers={
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {self.api_key}"
+                    },
+                    content=orjson.dumps(request_body)
+                )
+            
+            response.raise_for_status()
+            result = orjson.loads(response.content)
+            
+            if self.is_anthropic:
+                text_parts = []
+                tool_calls = []
+                for block in result["content"]:
+                    if block["type"] == "text":
+                        text_parts.append(block["text"])
+                    elif block["type"] == "tool_use":
+                        tool_calls.append({
+                            "id": block["id"],
+                            "tool": block["name"],
+                            "arguments": block.get("input") or {}
+                        })
+                reply = "".join(text_parts), tool_calls
+            else:
+                message = result["choices"][0]["message"]
+                tool_calls = []
+                for call in message.get("tool_calls") or []:
+                    try:
+                        arguments = orjson.loads(call["function"].get("arguments") or "{}")
+                    except orjson.JSONDecodeError:
+                        arguments = {}
+                    tool_calls.append({
+                        "id": call["id"],
+                        "tool": call["function"]["name"],
+                        "arguments": arguments
+                    })
+                reply = message.get("content") or "", tool_calls
+            
+            if cache_key is not None:
+                _RESPONSE_CACHE[cache_key] = reply
+            return reply
         except Exception as e:
             logger.error(f"API error: {e}")
             raise
     
+    def _tool_result_messages(
+        self,
+        response: str,
+        tool_calls: List[Dict[str, Any]],
+        results: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Build the assistant tool-call turn and the matching tool-result turn(s)"""
+        if self.is_anthropic:
+            assistant_content = [{"type": "text", "text": response}] if response else []
+            assistant_content.extend(
+                {"type": "tool_use", "id": call["id"], "name": call["tool"], "input": call["arguments"]}
+                for call in tool_calls
+            )
+            return [
+                {"role": "assistant", "content": assistant_content},
+                {"role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": call["id"], "content": result}
+                    for call, result in zip(tool_calls, results)
+                ]},
+            ]
+        
+        return [
+            {
+                "role": "assistant",
+                "content": response or None,
+                "tool_calls": [
+                    {
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {
+                            "name": call["tool"],
+                            "arguments": orjson.dumps(call["arguments"]).decode()
+                        }
+                    }
+                    for call in tool_calls
+                ]
+            },
+            *(
+                {"role": "tool", "tool_call_id": call["id"], "content": result}
+                for call, result in zip(tool_calls, results)
+            ),
+        ]
+    
+    def _can_use_prefetch(self, call: Dict[str, Any], query: str) -> bool:
+        """Whether a tool call can be answered by the speculative prefetch run with `query`"""
+        if call.get("tool") != self.prefetch_tool:
+            return False
+        arguments = call.get("arguments") or {}
+        # Any other argument or a different query needs a real call
+        return set(arguments) <= {"query"} and arguments.get("query", query) == query
+    
     async def _handle_tool_call(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Execute a tool and return the result"""
         if tool_name not in self.tools_map:
@@ -262,9 +505,25 @@ class GradientAgent:
             logger.error(f"Tool execution error for {tool_name}: {e}")
             return f"Error executing tool: {str(e)}"
     
+    async def _handle_tool_batch(self, tool_calls: List[Dict[str, Any]]) -> List[str]:
+        """Execute a batch of independent tool calls, up to TOOL_CONCURRENCY_LIMIT at a time"""
+        semaphore = asyncio.Semaphore(TOOL_CONCURRENCY_LIMIT)
+        
+        async def run_one(call: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._handle_tool_call(call["tool"], call.get("arguments", {}))
+        
+        results = await asyncio.gather(*[run_one(call) for call in tool_calls], return_exceptions=True)
+        
+        # One failing call must not poison the rest of the batch
+        return [
+            f"Error executing tool: {str(result)}" if isinstance(result, BaseException) else result
+            for result in results
+        ]
+    
     async def _handle_agent_delegation(self, agent_name: str, message: str, session: Session) -> str:
         """Delegate to a sub-agent"""
-        sub_agent = next((a for a in self.sub_agents if a.name == agent_name), None)
+        sub_agent = self.sub_agents_map.get(agent_name)
         if not sub_agent:
             return f"Error: Sub-agent '{agent_name}' not found"
         
@@ -283,8 +542,8 @@ class GradientAgent:
             {"role": "system", "content": self._build_system_prompt()}
         ]
         
-        # Add conversation history
-        messages.extend(session.get_messages_dict())
+        # Add recent conversation history (built once; tool turns below append to this list)
+        messages.extend(session.get_messages_dict(HISTORY_TURNS))
         
         # Add current user message
         messages.append({"role": "user", "content": message})
@@ -292,24 +551,83 @@ class GradientAgent:
         max_iterations = 10  # Prevent infinite loops
         iteration = 0
         
-        while iteration < max_iterations:
-            iteration += 1
-            
-            # Call Gradient AI
-            response = await self._call_gradient(messages)
-            
-            # Check if response contains tool call or agent delegation
-            try:
-                # Try to parse as JSON
-                response_data = json.loads(response)
+        # Speculatively run the prefetch tool while the model produces its first turn
+        prefetch_task = None
+        if SPECULATIVE_TOOL_PREFETCH and self.prefetch_tool in self.tools_map:
+            prefetch_task = asyncio.create_task(
+                self._handle_tool_call(self.prefetch_tool, {"query": message})
+            )
+        
+        speculative_task = None
+        try:
+            while iteration < max_iterations:
+                iteration += 1
+                
+                # Call Gradient AI
+                response, native_calls = await self._call_gradient(messages)
+                
+                # Only the first turn can use the speculative result
+                speculative_task, prefetch_task = prefetch_task, None
                 
-                if "tool" in response_data:
+                if native_calls:
+                    # Native function calling - run all requested tools as one batch
+                    logger.info(f"Native tool calls: {[call['tool'] for call in native_calls]}")
+                    
+                    if (
+                        speculative_task is not None
+                        and len(native_calls) == 1
+                        and self._can_use_prefetch(native_calls[0], message)
+                    ):
+                        logger.info(f"Using speculative result for {self.prefetch_tool}")
+                        tool_results = [await speculative_task]
+                    else:
+                        if speculative_task is not None:
+                            speculative_task.cancel()
+                        tool_results = await self._handle_tool_batch(native_calls)
+                    
+                    messages.extend(self._tool_result_messages(response, native_calls, tool_results))
+                    continue
+                
+                # Fallback: check if response contains a JSON tool call or agent delegation
+                response_data = _parse_action(response)
+                use_speculative = (
+                    speculative_task is not None
+                    and response_data is not None
+                    and self._can_use_prefetch(response_data, message)
+                )
+                if speculative_task is not None and not use_speculative:
+                    speculative_task.cancel()
+                if response_data is None:
+                    # Plain prose, treat as final answer
+                    return response
+                
+                if "tools" in response_data:
+                    # Batch of independent tool calls
+                    tool_calls = response_data["tools"]
+                    logger.info(f"Tool batch: {[call.get('tool') for call in tool_calls]}")
+                    
+                    tool_results = await self._handle_tool_batch(tool_calls)
+                    combined_result = "\n".join(
+                        f"[{call.get('tool')}] {result}"
+                        for call, result in zip(tool_calls, tool_results)
+                    )
+                    
+                    # Add combined tool results to messages and continue
+                    messages.append({"role": "assistant", "content": response})
+                    messages.append({"role": "user", "content": f"Tool results:\n{combined_result}"})
+                    continue
+                
+                elif "tool" in response_data:
                     # Tool call
                     tool_name = response_data["tool"]
                     arguments = response_data.get("arguments", {})
                     logger.info(f"Tool call: {tool_name} with args {arguments}")
                     
-                    tool_result = await self._handle_tool_call(tool_name, arguments)
+                    if use_speculative:
+                        logger.info(f"Using speculative result for {tool_name}")
+                        tool_result = await speculative_task
+                    else:
+                        tool_result = await self._handle_tool_call(tool_name, arguments)
                     
                     # Add tool result to messages and continue
                     messages.append({"role": "assistant", "content": response})
@@ -329,14 +647,15 @@ class GradientAgent:
                     messages.append({"role": "user", "content": f"Sub-agent result: {agent_result}"})
                     continue
                 
-            except json.JSONDecodeError:
-                # Not a JSON response, treat as final answer
-                pass
+                # Final response
+                return response
             
-            # Final response
-            return response
-        
-        return "Error: Maximum iterations reached"
+            return "Error: Maximum iterations reached"
+        finally:
+            # Don't leave a speculative lookup running if the turn failed part-way
+            for task in (prefetch_task, speculative_task):
+                if task is not None and not task.done():
+                    task.cancel()
     
     async def run_async(
         self,
@@ -348,8 +667,6 @@ class GradientAgent:
         Main entry point for processing user messages
         Yields events similar to Google ADK for compatibility
         """
-        session_key = f"{self.name}:{user_id}:{session_id}"
-        
         # Extract message text
         message_text = ""
         if "content" in new_message and "parts" in new_message["content"]:
@@ -360,16 +677,18 @@ class GradientAgent:
         message_text = message_text.strip()
         logger.info(f"Processing message: {message_text[:100]}...")
         
-        # Get or create session
-        session = Session(session_id=session_id, user_id=user_id, app_name=self.name)
-        
-        # Add user message to history
-        session.add_message("user", message_text)
+        # Get or create session so history carries over between turns
+        session = (
+            self.session_service.get_session(self.name, user_id, session_id)
+            or self.session_service.create_session(self.name, user_id, session_id)
+        )
         
-        # Process message and get response
+        # Process message and get response (_process_message appends the new
+        # user message after the existing history itself)
         response_text = await self._process_message(message_text, session)
         
-        # Add assistant response to history
+        # Record the exchange in the session history
+        session.add_message("user", message_text)
         session.add_message("assistant", response_text)
         
         # Yield response event (compatible with existing code)
@@ -391,6 +710,33 @@ class GradientAgent:
                 parts=[ResponseEvent.Content.Part(text=response_text)]
             )
         )
+    
+    async def run_batch_async(
+        self,
+        user_id: str,
+        session_id_prefix: str,
+        messages: List[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Process several independent messages concurrently
+        Each message gets its own session ("<prefix>:<index>"); results keep input order
+        """
+        async def run_one(index: int, new_message: Dict[str, Any]) -> str:
+            session_id = f"{session_id_prefix}:{index}"
+            chunks = []
+            try:
+                async for event in self.run_async(user_id, session_id, new_message):
+                    for part in event.content.parts:
+                        if part.text:
+                            chunks.append(part.text)
+            finally:
+                # Batch sessions are single-use
+                self.session_service.delete_session(self.name, user_id, session_id)
+            return "".join(chunks)
+        
+        return list(await asyncio.gather(*[
+            run_one(index, new_message) for index, new_message in enumerate(messages)
+        ]))
 
 
 class InMemoryRunner:
@@ -399,7 +745,8 @@ class InMemoryRunner:
     def __init__(self, agent: GradientAgent, app_name: str):
         self.agent = agent
         self.app_name = app_name
-        self.session_service = SessionService()
+        # Share the agent's session store so sessions created here are the ones it uses
+        self.session_service = agent.session_service
         logger.info(f"Initialized InMemoryRunner for app: {app_name}")
     
     async def run_async(
@@ -411,3 +758,16 @@ class InMemoryRunner:
         """Run the agent asynchronously"""
         async for event in self.agent.run_async(user_id, session_id, new_message):
             yield event
+    
+    async def run_batch_async(
+        self,
+        user_id: str,
+        session_id_prefix: str,
+        messages: List[Dict[str, Any]]
+    ) -> List[str]:
+        """Run several independent messages through the agent concurrently"""
+        return await self.agent.run_batch_async(user_id, session_id_prefix, messages)
+    
+    def end_session(self, user_id: str, session_id: str):
+        """Drop a conversation the caller won't continue"""
+        self.session_service.delete_session(self.agent.name, user_id, session_id)
@@ -4,7 +4,7 @@ os.environ["GOOGLE_ADK_DISABLE_TELEMETRY"] = "1"
 
 # Monkey-patch telemetry to completely disable it
 import sys
-from unittest.mock import MagicMock
+import types
 
 # Create a no-op decorator that preserves function signatures
 def noop_decorator(*args, **kwargs):
@@ -16,28 +16,27 @@ def noop_decorator(*args, **kwargs):
             return func
         return decorator
 
-# Create a fake telemetry module
-fake_telemetry = MagicMock()
+# Create a fake telemetry module exposing the tracing hooks ADK imports
+fake_telemetry = types.ModuleType("google.adk.telemetry")
 fake_telemetry.trace_call_llm = noop_decorator
+fake_telemetry.trace_tool_call = noop_decorator
+fake_telemetry.trace_merged_tool_calls = noop_decorator
+fake_telemetry.trace_send_data = noop_decorator
+# Any other symbol resolves to the no-op too (module-level __getattr__, PEP 562)
+fake_telemetry.__getattr__ = lambda name: noop_decorator
 sys.modules['google.adk.telemetry'] = fake_telemetry
 
 print("🔇 Disabled Google ADK telemetry (avoids thought_signature bytes serialization issue)")
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import contextlib
+import itertools
 import uvicorn
-from typing import List
+from typing import Optional, Set, Tuple
 import logging
 
-# Force load Quartz/PyObjC for pynput (required for PyInstaller)
-try:
-    import Quartz
-    _ = Quartz.CGEventGetIntegerValueField
-    _ = Quartz.CGEventGetFlags
-    _ = Quartz.CGEventGetType
-except (ImportError, AttributeError) as e:
-    print(f"⚠️  Warning: Could not preload Quartz functions: {e}")
-
 # Set up logging
 logger = logging.getLogger("arrow")
 logger.setLevel(logging.INFO)
@@ -47,43 +46,97 @@ from utils import (
     ClipboardManager,
     KeyboardMonitor,
     ScreenshotHandler,
-    get_settings_manager
+    get_settings_manager,
+    get_all_settings_cached,
+    is_settings_db_ready
 )
 
 # Load environment variables from encrypted settings database
 def load_env_from_settings():
-    """Load environment variables from settings database into os.environ."""
-    try:
-        settings_mgr = get_settings_manager()
-        all_settings = settings_mgr.get_all_settings(include_secrets=True, decrypt_secrets=True)
-        
-        for category, settings in all_settings.items():
-            for key, value in settings.items():
-                if isinstance(value, str):
-                    os.environ[key] = value
-                    logger.info(f"Loaded {key} from settings database")
-    except Exception as e:
-        logger.warning(f"Could not load settings from database: {e}")
+    """Load environment variables from settings database into os.environ (.env fallback)."""
+    if not is_settings_db_ready():
+        # Only pay for dotenv (import + .env probe) when the database can't be used
+        logger.warning("Settings database unavailable, loading .env instead")
         from dotenv import load_dotenv
         load_dotenv()
+        return
+    
+    all_settings = get_all_settings_cached(include_secrets=True, decrypt_secrets=True)
+    env_updates = {
+        key: value
+        for settings in all_settings.values()
+        for key, value in settings.items()
+        if isinstance(value, str)
+    }
+    os.environ.update(env_updates)
+    logger.info(f"Loaded {len(env_updates)} variable(s) from settings database: {', '.join(env_updates)}")
 
 load_env_from_settings()
 
-# Import Arrow backend agent
-try:
-    from agent import root_agent
-    from gradient_agent import InMemoryRunner
+
+async def _init_tadata():
+    """Load Tadata tools if configured"""
+    try:
+        from tools.tadata import get_tadata_integration, reload_tadata_integration_async
+        tadata = get_tadata_integration()
+        if tadata.is_configured():
+            print(f"🔄 Loading Tadata tools from {len(tadata.servers)} server(s)...")
+            await reload_tadata_integration_async()
+    except Exception as e:
+        logger.error(f"Failed to load Tadata tools on startup: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+async def _close_http_clients():
+    """Close shared HTTP clients"""
+    try:
+        from gradient_agent import close_http_client as close_gradient_client
+        await close_gradient_client()
+    except Exception as e:
+        logger.warning(f"Failed to close Gradient HTTP client: {e}")
+
+    try:
+        from cloudflare_client import close_http_client as close_cloudflare_client
+        await close_cloudflare_client()
+    except Exception as e:
+        logger.warning(f"Failed to close Cloudflare HTTP client: {e}")
+
+    try:
+        from utils.http_clients import close_host_clients
+        await close_host_clients()
+    except Exception as e:
+        logger.warning(f"Failed to close integration HTTP clients: {e}")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """App lifespan - bootstrap keyboard monitor and Tadata concurrently, clean up on exit"""
+    # Hotkey broadcasts from the keyboard thread are scheduled onto this loop
+    connection_manager.loop = asyncio.get_running_loop()
+    
+    # Keyboard monitor setup is blocking (settings DB, Quartz, pynput), so it runs
+    # in a worker thread while Tadata tools load over the network
+    await asyncio.gather(
+        asyncio.to_thread(initialize_backend),
+        _init_tadata()
+    )
+    print("✅ Pointer backend startup completed!")
+    
+    yield
     
-    arrow_runner = InMemoryRunner(agent=root_agent, app_name="arrow_agent")
-    ARROW_BACKEND_AVAILABLE = True
-    print("✅ Arrow backend agent loaded successfully")
-except ImportError as e:
-    ARROW_BACKEND_AVAILABLE = False
-    arrow_runner = None
-    print(f"⚠️  Arrow backend not available: {e}, running in basic mode")
+    if keyboard_monitor:
+        keyboard_monitor.stop()
+    await _close_http_clients()
+    
+    # Only close the knowledge base if something loaded it
+    rag = sys.modules.get("tools.rag")
+    if rag is not None:
+        rag.close_store()
+
 
 # Create FastAPI app
-app = FastAPI(title="Arrow Backend")
+app = FastAPI(title="Arrow Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -96,12 +149,6 @@ app.add_middleware(
 # Import and include routers
 from routes import health, settings, hotkey, rag, agent, storage, calendar_auth, integrations
 
-# Set the ARROW_BACKEND_AVAILABLE flag in health router
-health.ARROW_BACKEND_AVAILABLE = ARROW_BACKEND_AVAILABLE
-
-# Set the arrow_runner in agent router
-agent.arrow_runner = arrow_runner
-
 # Include all route modules
 app.include_router(health.router)
 app.include_router(settings.router)
@@ -113,113 +160,158 @@ app.include_router(calendar_auth.router)
 app.include_router(integrations.router)
 
 
+# The agent runner is built lazily on the first /api/agent request; report the
+# backend as available until that fails
+health.ARROW_BACKEND_AVAILABLE = True
+
+# ARROW_EAGER_IMPORT=1 builds the agent at import time (e.g. for CI import checks)
+if os.getenv("ARROW_EAGER_IMPORT") == "1":
+    try:
+        agent.load_runner()
+    except ImportError as e:
+        print(f"⚠️  Arrow backend not available: {e}, running in basic mode")
+
+
 @app.get("/api/settings")
 async def get_all_settings_toplevel():
     """Return all settings grouped by category (non-secrets only)."""
     try:
-        settings_mgr = get_settings_manager()
-        return settings_mgr.get_all_settings(include_secrets=False, decrypt_secrets=False)
+        return get_all_settings_cached(include_secrets=False, decrypt_secrets=False)
     except Exception as e:
         logger.warning(f"Could not load all settings: {e}")
         return {}
 
 
-# Debug endpoint for checking tools
-@app.get("/api/debug/tools")
-async def debug_tools():
-    """Debug endpoint to see what tools are loaded"""
-    try:
-        from tools.tadata import get_tadata_integration
-        from agents.coordinator import Coordinator
-
-        tadata = get_tadata_integration()
-
-        # Get detailed info about each tool
-        tool_details = []
-        for idx, tool in enumerate(Coordinator.tools):
-            tool_info = {
-                "index": idx + 1,
-                "type": type(tool).__name__,
-                "name": getattr(tool, 'name', 'unknown'),
-                "has_name": hasattr(tool, 'name'),
-                "has_description": hasattr(tool, 'description'),
-                "has_func": hasattr(tool, 'func') or hasattr(tool, '_run'),
-                "is_callable": callable(tool),
-                "attributes": [attr for attr in dir(tool) if not attr.startswith('_')][:10]
-            }
+# Debug endpoints are only registered with ARROW_DEBUG_ROUTES=1
+if os.getenv("ARROW_DEBUG_ROUTES") == "1":
+    # Debug endpoint for checking tools
+    @app.get("/api/debug/tools")
+    async def debug_tools():
+        """Debug endpoint to see what tools are loaded"""
+        try:
+            from tools.tadata import get_tadata_integration
+            from agents.coordinator import Coordinator
+
+            tadata = get_tadata_integration()
+
+            # Get detailed info about each tool
+            tool_details = []
+            for idx, tool in enumerate(Coordinator.tools):
+                tool_info = {
+                    "index": idx + 1,
+                    "type": type(tool).__name__,
+                    "name": getattr(tool, 'name', 'unknown'),
+                    "has_name": hasattr(tool, 'name'),
+                    "has_description": hasattr(tool, 'description'),
+                    "has_func": hasattr(tool, 'func') or hasattr(tool, '_run'),
+                    "is_callable": callable(tool),
+                    "attributes": list(itertools.islice((attr for attr in dir(tool) if attr[0] != '_'), 10))
+                }
 
-            if hasattr(tool, 'description'):
-                tool_info['description'] = getattr(tool, 'description', '')[:100]
-
-            tool_details.append(tool_info)
-
-        return {
-            "tadata_configured": tadata.is_configured(),
-            "tadata_servers": list(tadata.servers.keys()) if tadata.servers else [],
-            "tadata_tools_count": len(tadata.get_tools()),
-            "tadata_connected": tadata._connected,
-            "coordinator_tools_count": len(Coordinator.tools),
-            "coordinator_has_tools_attr": hasattr(Coordinator, 'tools'),
-            "coordinator_tools_is_list": isinstance(Coordinator.tools, list),
-            "tool_details": tool_details
-        }
-    except Exception as e:
-        import traceback
-        return {"error": str(e), "traceback": traceback.format_exc()}
+                if hasattr(tool, 'description'):
+                    tool_info['description'] = getattr(tool, 'description', '')[:100]
 
+                tool_details.append(tool_info)
 
-@app.get("/api/debug/test-tadata")
-async def test_tadata_access():
-    """Test if Coordinator can access Tadata tools"""
-    try:
-        from tools.tadata import get_tadata_integration
-        from agents.coordinator import Coordinator
+            return {
+                "tadata_configured": tadata.is_configured(),
+                "tadata_servers": list(tadata.servers.keys()) if tadata.servers else [],
+                "tadata_tools_count": len(tadata.get_tools()),
+                "tadata_connected": tadata._connected,
+                "coordinator_tools_count": len(Coordinator.tools),
+                "coordinator_has_tools_attr": hasattr(Coordinator, 'tools'),
+                "coordinator_tools_is_list": isinstance(Coordinator.tools, list),
+                "tool_details": tool_details
+            }
+        except Exception as e:
+            import traceback
+            return {"error": str(e), "traceback": traceback.format_exc()}
 
-        tadata = get_tadata_integration()
 
-        # Ensure Tadata is connected
-        if tadata.is_configured() and not tadata._connected:
-            await tadata.ensure_connected()
-
-        # Check if tools are in Coordinator
-        tadata_tool_names = [getattr(t, 'name', '') for t in tadata.get_tools()]
-        coordinator_tool_names = [getattr(t, 'name', 'unknown') for t in Coordinator.tools]
-
-        # Find Tadata tools in Coordinator
-        tadata_in_coordinator = [name for name in tadata_tool_names if name in coordinator_tool_names]
-
-        return {
-            "tadata_connected": tadata._connected,
-            "tadata_tools": tadata_tool_names,
-            "coordinator_total_tools": len(Coordinator.tools),
-            "coordinator_tool_names": coordinator_tool_names,
-            "tadata_tools_in_coordinator": tadata_in_coordinator,
-            "tadata_tools_accessible": len(tadata_in_coordinator) > 0,
-            "message": f"✅ {len(tadata_in_coordinator)} Tadata tools accessible" if len(tadata_in_coordinator) > 0 else "❌ No Tadata tools found in Coordinator"
-        }
-    except Exception as e:
-        import traceback
-        return {"error": str(e), "traceback": traceback.format_exc()}
+    @app.get("/api/debug/test-tadata")
+    async def test_tadata_access():
+        """Test if Coordinator can access Tadata tools"""
+        try:
+            from tools.tadata import get_tadata_integration
+            from agents.coordinator import Coordinator
+
+            tadata = get_tadata_integration()
+
+            # Ensure Tadata is connected
+            if tadata.is_configured() and not tadata._connected:
+                await tadata.ensure_connected()
+
+            # Check if tools are in Coordinator
+            tadata_tool_names = [getattr(t, 'name', '') for t in tadata.get_tools()]
+            coordinator_tool_names = [getattr(t, 'name', 'unknown') for t in Coordinator.tools]
+
+            # Find Tadata tools in Coordinator
+            tadata_in_coordinator = [name for name in tadata_tool_names if name in coordinator_tool_names]
+
+            return {
+                "tadata_connected": tadata._connected,
+                "tadata_tools": tadata_tool_names,
+                "coordinator_total_tools": len(Coordinator.tools),
+                "coordinator_tool_names": coordinator_tool_names,
+                "tadata_tools_in_coordinator": tadata_in_coordinator,
+                "tadata_tools_accessible": len(tadata_in_coordinator) > 0,
+                "message": f"✅ {len(tadata_in_coordinator)} Tadata tools accessible" if len(tadata_in_coordinator) > 0 else "❌ No Tadata tools found in Coordinator"
+            }
+        except Exception as e:
+            import traceback
+            return {"error": str(e), "traceback": traceback.format_exc()}
 
 
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.connections: List[WebSocket] = []
+        self.connections: Set[WebSocket] = set()
+        # The server's event loop, which owns every WebSocket (set in lifespan)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
     
     def add(self, websocket: WebSocket):
-        self.connections.append(websocket)
+        self.connections.add(websocket)
     
     def remove(self, websocket: WebSocket):
-        if websocket in self.connections:
-            self.connections.remove(websocket)
+        self.connections.discard(websocket)
     
     def get_all(self):
-        return self.connections[:]
+        return list(self.connections)
+    
+    def snapshot(self) -> Tuple[WebSocket, ...]:
+        """Immutable copy of the current connections, safe to iterate while others connect/disconnect"""
+        return tuple(self.connections)
+    
+    async def broadcast(self, message: dict):
+        """Send a JSON message to every connection concurrently (must run on the server loop)"""
+        connections = self.snapshot()
+        results = await asyncio.gather(
+            *(ws.send_json(message) for ws in connections),
+            return_exceptions=True
+        )
+        for ws, result in zip(connections, results):
+            if isinstance(result, WebSocketDisconnect):
+                print("❌ [WebSocket] Client disconnected, dropping connection", flush=True)
+                self.connections.discard(ws)
+            elif isinstance(result, Exception):
+                print(f"❌ [WebSocket] Send failed: {result}", flush=True)
+    
+    def broadcast_threadsafe(self, message: dict):
+        """Schedule broadcast() on the server loop from another thread (e.g. the keyboard listener)"""
+        if self.loop is None or self.loop.is_closed():
+            print("⚠️  [WebSocket] Server loop not running, dropping broadcast", flush=True)
+            return
+        future = asyncio.run_coroutine_threadsafe(self.broadcast(message), self.loop)
+        future.add_done_callback(_log_broadcast_error)
     
     def count(self):
         return len(self.connections)
 
+def _log_broadcast_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"❌ [WebSocket] Broadcast failed: {future.exception()}", flush=True)
+
+
 connection_manager = ConnectionManager()
 
 # Initialize managers
@@ -231,24 +323,6 @@ screenshot_handler = ScreenshotHandler()
 keyboard_monitor = None
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event - keyboard monitor is initialized in main"""
-    print("✅ Pointer backend startup event completed!")
-
-    # Load Tadata tools if configured
-    try:
-        from tools.tadata import get_tadata_integration, reload_tadata_integration_async
-        tadata = get_tadata_integration()
-        if tadata.is_configured():
-            print(f"🔄 Loading Tadata tools from {len(tadata.servers)} server(s)...")
-            await reload_tadata_integration_async()
-    except Exception as e:
-        logger.error(f"Failed to load Tadata tools on startup: {e}")
-        import traceback
-        traceback.print_exc()
-
-
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket connection for real-time events"""
@@ -271,7 +345,7 @@ def get_keyboard_monitor():
 
 
 def initialize_backend():
-    """Initialize backend services before starting uvicorn"""
+    """Initialize backend services (run from the app lifespan in a worker thread)"""
     global keyboard_monitor
     
     try:
@@ -307,6 +381,14 @@ def initialize_backend():
         except Exception as e:
             print(f"⚠️  Could not load hotkey settings: {e}, using defaults", flush=True)
         
+        # Force load Quartz/PyObjC for pynput (only needed in PyInstaller builds)
+        if getattr(sys, 'frozen', False):
+            try:
+                import Quartz
+                _ = (Quartz.CGEventGetIntegerValueField, Quartz.CGEventGetFlags, Quartz.CGEventGetType)
+            except (ImportError, AttributeError) as e:
+                print(f"⚠️  Warning: Could not preload Quartz functions: {e}", flush=True)
+        
         # Initialize keyboard monitor with both hotkey configs
         print("📡 Creating keyboard monitor...", flush=True)
         keyboard_monitor = KeyboardMonitor(
@@ -329,14 +411,29 @@ def initialize_backend():
         raise
 
 
+def get_server_options():
+    """uvicorn loop/http implementations: uvloop + httptools when installed, else the pure-Python defaults"""
+    options = {"ws": "websockets"}
+    try:
+        import uvloop  # noqa: F401 - not available on Windows
+        options["loop"] = "uvloop"
+    except ImportError:
+        print("ℹ️  uvloop not available, using default asyncio loop", flush=True)
+    try:
+        import httptools  # noqa: F401
+        options["http"] = "httptools"
+    except ImportError:
+        print("ℹ️  httptools not available, using h11", flush=True)
+    return options
+
+
 if __name__ == "__main__":
-    # Initialize keyboard monitor before starting server
-    initialize_backend()
-    
+    # Backend services are initialized in the app lifespan
     # Run uvicorn server
     uvicorn.run(
         app,
         host="127.0.0.1",
         port=8765,
-        log_level="info"
+        log_level="info",
+        **get_server_options()
     )
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
+import asyncio
 import logging
+import os
+import time
 import uuid
 
 try:
@@ -13,8 +16,53 @@ logger = logging.getLogger("arrow.routes.agent")
 
 router = APIRouter(prefix="/api", tags=["agent"])
 
-# Will be set by main.py
-arrow_runner = None
+# Max seconds the agent waits for Cloudflare memory context before running without it.
+# A late lookup keeps running and fills cloudflare_client's search cache (cleared on
+# ingest) for the next identical message.
+CLOUDFLARE_CONTEXT_TIMEOUT = float(os.environ.get("CLOUDFLARE_CONTEXT_TIMEOUT", "0.3"))
+
+# Agent runner, built on first use so startup and health checks don't pay for
+# importing the whole agent/tool tree
+_runner = None
+_runner_lock = asyncio.Lock()
+
+
+def load_runner():
+    """Import the agent tree and build the runner (blocking; memoized)."""
+    global _runner
+    if _runner is None:
+        from agent import root_agent
+        from gradient_agent import InMemoryRunner
+        
+        _runner = InMemoryRunner(agent=root_agent, app_name="arrow_agent")
+        logger.info("✅ Arrow backend agent loaded successfully")
+    return _runner
+
+
+async def get_runner():
+    """Return the agent runner, building it off the event loop on first use."""
+    if _runner is None:
+        async with _runner_lock:
+            if _runner is None:
+                try:
+                    await asyncio.to_thread(load_runner)
+                except ImportError as e:
+                    from routes import health
+                    health.ARROW_BACKEND_AVAILABLE = False
+                    logger.error(f"⚠️  Arrow backend not available: {e}")
+                    raise HTTPException(status_code=503, detail="Arrow backend not available")
+    return _runner
+
+
+async def _get_memory_context(message: str) -> str:
+    """Cloudflare memory context for a message, bounded by CLOUDFLARE_CONTEXT_TIMEOUT."""
+    task = asyncio.ensure_future(cf_client.build_cloudflare_context(message))
+    try:
+        # shield() so a timeout here doesn't cancel the lookup that warms the cache
+        return await asyncio.wait_for(asyncio.shield(task), CLOUDFLARE_CONTEXT_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.info(f"⏳ Cloudflare context not ready after {CLOUDFLARE_CONTEXT_TIMEOUT}s, continuing without it")
+        return ""
 
 
 class AgentRequest(BaseModel):
@@ -36,18 +84,23 @@ async def process_query(request: dict):
         query = request.get("query", "")
         context = request.get("context", {})
         
-        # Convert to Pointer backend format
-        agent_request = AgentRequest(
+        selected = context.get('selected_text')
+        
+        # Convert to Pointer backend format (internal call: skip pydantic validation)
+        agent_request = AgentRequest.model_construct(
             message=query,
             context_parts=[
-                {"type": "text", "content": f"Selected text: {context.get('selected_text', '')}"}
-            ] if context.get('selected_text') else None,
+                {"type": "text", "content": f"Selected text: {selected}"}
+            ] if selected else None,
             session_id=None
         )
         
         # Forward to Pointer backend
         result = await process_agent_request(agent_request)
         
+        # The legacy format has no session_id, so this conversation can't be continued
+        (await get_runner()).end_session("default_user", result.session_id)
+        
         return {"success": True, "response": result.response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -64,8 +117,7 @@ async def process_agent_request(request: AgentRequest):
     Returns:
         AgentResponse with agent's response and metadata
     """
-    if not arrow_runner:
-        raise HTTPException(status_code=503, detail="Arrow backend not available")
+    arrow_runner = await get_runner()
     
     try:
         logger.info("=" * 60)
@@ -75,26 +127,11 @@ async def process_agent_request(request: AgentRequest):
         logger.info("=" * 60)
         
         # Generate session_id if not provided
-        session_id = request.session_id or str(uuid.uuid4())
+        session_id = request.session_id or uuid.uuid4().hex
         user_id = "default_user"
         
-        # Create or get session
-        session = arrow_runner.session_service.get_session(
-            app_name=arrow_runner.app_name,
-            user_id=user_id,
-            session_id=session_id
-        )
-        if not session:
-            session = arrow_runner.session_service.create_session(
-                app_name=arrow_runner.app_name,
-                user_id=user_id,
-                session_id=session_id
-            )
-        
         # Prepare the message content
         message_parts = [request.message]
-        logger.info(f"📝 User message: {request.message}")
-        print(f"[DEBUG] User message: {request.message}")
         
         # Add context parts if provided
         if request.context_parts:
@@ -108,7 +145,7 @@ async def process_agent_request(request: AgentRequest):
         # Prepend Cloudflare Vectorize memory context if enabled
         if cf_client and cf_client.is_enabled():
             try:
-                memory_context = await cf_client.build_cloudflare_context(request.message)
+                memory_context = await _get_memory_context(request.message)
                 if memory_context:
                     combined_message = memory_context + combined_message
                     logger.info("📡 Prepended Cloudflare memory context")
@@ -121,17 +158,18 @@ async def process_agent_request(request: AgentRequest):
             }
         }
         
-        logger.info(f"📨 Message prepared for agent")
-        print(f"[DEBUG] Message length: {len(combined_message)}")
+        logger.debug("📨 Message prepared for agent (%d chars)", len(combined_message))
         
         # Run the agent and collect the response
         logger.info("🤖 Starting agent execution...")
-        print("[DEBUG] Starting agent execution...")
-        response_text = ""
+        response_chunks: list[str] = []
         event_count = 0
         
-        import time
-        start_time = time.time()
+        # Per-event/per-part logging is checked once up front so the streaming
+        # loop does no formatting or clock reads when those levels are off
+        log_events = logger.isEnabledFor(logging.INFO)
+        log_chunks = logger.isEnabledFor(logging.DEBUG)
+        start_time = time.monotonic()
         
         async for event in arrow_runner.run_async(
             user_id=user_id,
@@ -139,40 +177,39 @@ async def process_agent_request(request: AgentRequest):
             new_message=new_message
         ):
             event_count += 1
-            elapsed = time.time() - start_time
-            logger.info(f"⏱️  Event {event_count} at {elapsed:.2f}s - Type: {type(event).__name__}")
-            print(f"[DEBUG] Event {event_count}: {type(event).__name__}")
+            if log_events:
+                logger.info("⏱️  Event %d at %.2fs - Type: %s", event_count, time.monotonic() - start_time, type(event).__name__)
             
-            # Log function calls
-            if hasattr(event, 'content') and event.content:
-                for part in event.content.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        func_name = part.function_call.name if part.function_call.name else "unknown"
-                        print("\n" + "="*60)
-                        print(f"🔧 TOOL CALLED: {func_name}")
-                        print(f"📋 Arguments: {part.function_call.args}")
-                        print("="*60 + "\n")
-                        logger.info(f"🔧 Function call: {func_name}")
-                        logger.info(f"📋 Arguments: {part.function_call.args}")
-                    elif hasattr(part, 'function_response') and part.function_response:
-                        func_name = part.function_response.name if part.function_response.name else "unknown"
-                        response_preview = str(part.function_response.response)[:200]
-                        print("\n" + "="*60)
-                        print(f"✅ TOOL RESPONSE: {func_name}")
-                        print(f"📤 Response preview: {response_preview}...")
-                        print("="*60 + "\n")
-                        logger.info(f"✅ Function response: {func_name}")
-                    elif hasattr(part, 'text') and part.text:
-                        response_text += part.text
-                        logger.info(f"💬 Agent response chunk: {part.text[:100]}...")
-                        print(f"[DEBUG] 💬 Text: {part.text[:200]}...")
-        
-        total_time = time.time() - start_time
+            # Collect text and log function calls
+            content = getattr(event, 'content', None)
+            if content:
+                for part in content.parts:
+                    text = getattr(part, 'text', None)
+                    if text:
+                        response_chunks.append(text)
+                        if log_chunks:
+                            logger.debug("💬 Agent response chunk: %.100s...", text)
+                        continue
+                    
+                    function_call = getattr(part, 'function_call', None)
+                    if function_call:
+                        if log_events:
+                            logger.info("🔧 Function call: %s", function_call.name or "unknown")
+                            logger.info("📋 Arguments: %s", function_call.args)
+                        continue
+                    
+                    function_response = getattr(part, 'function_response', None)
+                    if function_response:
+                        if log_events:
+                            logger.info("✅ Function response: %s", function_response.name or "unknown")
+                        if log_chunks:
+                            logger.debug("📤 Response preview: %.200s...", function_response.response)
+        
+        response_text = "".join(response_chunks)
+        total_time = time.monotonic() - start_time
         logger.info(f"✅ Agent execution complete in {total_time:.2f}s. Total events: {event_count}")
         logger.info(f"📤 Final response length: {len(response_text)} characters")
-        logger.info(f"📤 Full response: {response_text}")
-        print(f"[DEBUG] Full response: {response_text}")
-
+        logger.debug("📤 Full response: %s", response_text)
         
         return AgentResponse(
             response=response_text or "No response generated",
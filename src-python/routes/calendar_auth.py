@@ -3,14 +3,17 @@ Calendar OAuth authentication routes.
 """
 
 from fastapi import APIRouter, HTTPException
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from pydantic import BaseModel
 import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+# The Google auth libraries are imported where they're used, so importing this
+# router (at server startup) doesn't load them
+if TYPE_CHECKING:
+    from google_auth_oauthlib.flow import Flow
+    from google.oauth2.credentials import Credentials
 
 router = APIRouter(prefix="/api/calendar", tags=["calendar"])
 
@@ -21,7 +24,7 @@ SCOPES = ["https://www.googleapis.com/auth/calendar"]
 REDIRECT_URI = "http://localhost:8765/api/calendar/auth/callback"
 
 # Global variable to store the flow object during OAuth process
-_oauth_flow: Optional[Flow] = None
+_oauth_flow: Optional["Flow"] = None
 
 
 class CredentialsInput(BaseModel):
@@ -70,8 +73,11 @@ def _get_token_path() -> Path:
     return _get_data_dir() / "calendar_token.json"
 
 
-def _load_credentials() -> Optional[Credentials]:
+def _load_credentials() -> Optional["Credentials"]:
     """Load stored OAuth credentials."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    
     token_path = _get_token_path()
     
     if not token_path.exists():
@@ -94,7 +100,7 @@ def _load_credentials() -> Optional[Credentials]:
         return None
 
 
-def _save_credentials(creds: Credentials):
+def _save_credentials(creds: "Credentials"):
     """Save OAuth credentials to disk."""
     token_path = _get_token_path()
     
@@ -111,7 +117,7 @@ def _save_credentials(creds: Credentials):
         json.dump(token_data, f, indent=2)
 
 
-def _get_user_email(creds: Credentials) -> Optional[str]:
+def _get_user_email(creds: "Credentials") -> Optional[str]:
     """Get the user's email address from their Google account."""
     try:
         from googleapiclient.discovery import build
@@ -205,6 +211,7 @@ async def save_oauth_credentials(input_data: CredentialsInput):
 async def start_oauth_flow():
     """Start the OAuth flow and return the authorization URL."""
     global _oauth_flow
+    from google_auth_oauthlib.flow import Flow
     
     creds_path = _get_credentials_path()
     data_dir = _get_data_dir()
@@ -359,7 +366,7 @@ async def get_auth_status():
     return await get_calendar_status()
 
 
-def get_calendar_credentials() -> Optional[Credentials]:
+def get_calendar_credentials() -> Optional["Credentials"]:
     """
     Get valid calendar credentials for use by the calendar tool.
     This function is used by tools/calendar.py.
@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from typing import List, Optional
 import logging
 
+from utils.settings_manager import get_settings_manager
+
 logger = logging.getLogger("pointer.routes.hotkey")
 
 router = APIRouter(prefix="/api/hotkey", tags=["hotkey"])
@@ -10,6 +12,15 @@ router = APIRouter(prefix="/api/hotkey", tags=["hotkey"])
 # Will be set by main.py
 keyboard_monitor = None
 
+# Decoded hotkey settings, loaded on first GET and kept in sync by the mutators below
+_hotkey_cache: Optional[dict] = None
+
+
+def invalidate_hotkey_cache():
+    """Drop the cached hotkey settings (called when the hotkey category changes elsewhere)."""
+    global _hotkey_cache
+    _hotkey_cache = None
+
 
 class HotkeyConfigFull(BaseModel):
     modifiers: List[str]
@@ -26,8 +37,11 @@ class HotkeyConfig(BaseModel):
 @router.get("")
 async def get_hotkey():
     """Get both popup and inline hotkey configurations."""
+    global _hotkey_cache
+    if _hotkey_cache is not None:
+        return dict(_hotkey_cache)
+    
     try:
-        from utils.settings_manager import get_settings_manager
         settings_mgr = get_settings_manager()
         
         hotkey_settings = settings_mgr.get_category("hotkey", include_secrets=False)
@@ -38,12 +52,13 @@ async def get_hotkey():
         inline_modifiers = hotkey_settings.get("inline_modifiers", ["cmd", "shift"]) if hotkey_settings else ["cmd", "shift"]
         inline_key = hotkey_settings.get("inline_key", "l") if hotkey_settings else "l"
         
-        return {
+        _hotkey_cache = {
             "modifiers": popup_modifiers,
             "key": popup_key,
             "inline_modifiers": inline_modifiers,
             "inline_key": inline_key
         }
+        return dict(_hotkey_cache)
     except Exception as e:
         logger.error(f"Error getting hotkeys: {e}")
         return {
@@ -57,7 +72,6 @@ async def get_hotkey():
 async def set_hotkeys(config: HotkeyConfigFull):
     """Set both popup and inline hotkey configurations."""
     try:
-        from utils.settings_manager import get_settings_manager
         settings_mgr = get_settings_manager()
         
         # Validate
@@ -70,15 +84,19 @@ async def set_hotkeys(config: HotkeyConfigFull):
         if not config.inline_key or len(config.inline_key) != 1:
             raise HTTPException(status_code=400, detail="Inline key must be a single character")
         
-        # Save to database
-        settings_mgr.set("hotkey", "modifiers", config.modifiers, is_secret=False, 
-                        description="Popup mode hotkey modifiers")
-        settings_mgr.set("hotkey", "key", config.key, is_secret=False, 
-                        description="Popup mode hotkey key")
-        settings_mgr.set("hotkey", "inline_modifiers", config.inline_modifiers, is_secret=False, 
-                        description="Inline mode hotkey modifiers")
-        settings_mgr.set("hotkey", "inline_key", config.inline_key, is_secret=False, 
-                        description="Inline mode hotkey key")
+        # Save to database (one transaction)
+        settings_mgr.set_many("hotkey", {
+            "modifiers": config.modifiers,
+            "key": config.key,
+            "inline_modifiers": config.inline_modifiers,
+            "inline_key": config.inline_key
+        }, is_secret=False, descriptions={
+            "modifiers": "Popup mode hotkey modifiers",
+            "key": "Popup mode hotkey key",
+            "inline_modifiers": "Inline mode hotkey modifiers",
+            "inline_key": "Inline mode hotkey key"
+        })
+        invalidate_hotkey_cache()
         
         # Update the keyboard monitor
         if keyboard_monitor:
@@ -109,7 +127,6 @@ async def set_hotkeys(config: HotkeyConfigFull):
 async def reset_hotkeys():
     """Reset both hotkeys to defaults (Popup: Cmd+Shift+K, Inline: Cmd+Shift+L)."""
     try:
-        from utils.settings_manager import get_settings_manager
         settings_mgr = get_settings_manager()
         
         default_popup_modifiers = ["cmd", "shift"]
@@ -117,11 +134,14 @@ async def reset_hotkeys():
         default_inline_modifiers = ["cmd", "shift"]
         default_inline_key = "l"
         
-        # Save to database
-        settings_mgr.set("hotkey", "modifiers", default_popup_modifiers, is_secret=False)
-        settings_mgr.set("hotkey", "key", default_popup_key, is_secret=False)
-        settings_mgr.set("hotkey", "inline_modifiers", default_inline_modifiers, is_secret=False)
-        settings_mgr.set("hotkey", "inline_key", default_inline_key, is_secret=False)
+        # Save to database (one transaction)
+        settings_mgr.set_many("hotkey", {
+            "modifiers": default_popup_modifiers,
+            "key": default_popup_key,
+            "inline_modifiers": default_inline_modifiers,
+            "inline_key": default_inline_key
+        }, is_secret=False)
+        invalidate_hotkey_cache()
         
         # Update the keyboard monitor
         if keyboard_monitor:
@@ -4,15 +4,18 @@ Alternative to Tadata - gives you full control
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-import os
 import httpx
 import logging
+import orjson
+
+from utils.http_clients import notion_client, supabase_client, exa_client, integration_env, with_retry
 
 logger = logging.getLogger("arrow.routes.integrations")
 
-router = APIRouter(prefix="/api/integrations", tags=["integrations"])
+router = APIRouter(prefix="/api/integrations", tags=["integrations"], default_response_class=ORJSONResponse)
 
 
 # ============================================
@@ -32,24 +35,17 @@ class NotionPageCreateRequest(BaseModel):
 @router.post("/notion/search")
 async def notion_search(request: NotionSearchRequest):
     """Search Notion workspace"""
-    notion_token = os.getenv("NOTION_API_TOKEN")
-    if not notion_token:
+    if not integration_env("NOTION_API_TOKEN"):
         raise HTTPException(status_code=400, detail="NOTION_API_TOKEN not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.notion.com/v1/search",
-                headers={
-                    "Authorization": f"Bearer {notion_token}",
-                    "Notion-Version": "2022-06-28",
-                    "Content-Type": "application/json"
-                },
-                json={"query": request.query},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        client = notion_client(integration_env("NOTION_API_TOKEN"))
+        response = await with_retry(lambda: client.post(
+            "/v1/search",
+            content=orjson.dumps({"query": request.query}),
+            timeout=30.0
+        ))
+        return orjson.loads(response.content)
     except httpx.HTTPError as e:
         logger.error(f"Notion API error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -58,41 +54,35 @@ async def notion_search(request: NotionSearchRequest):
 @router.post("/notion/create-page")
 async def notion_create_page(request: NotionPageCreateRequest):
     """Create a new Notion page"""
-    notion_token = os.getenv("NOTION_API_TOKEN")
-    if not notion_token:
+    if not integration_env("NOTION_API_TOKEN"):
         raise HTTPException(status_code=400, detail="NOTION_API_TOKEN not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Simple page creation - you'll need to configure parent database/page
-            response = await client.post(
-                "https://api.notion.com/v1/pages",
-                headers={
-                    "Authorization": f"Bearer {notion_token}",
-                    "Notion-Version": "2022-06-28",
-                    "Content-Type": "application/json"
+        client = notion_client(integration_env("NOTION_API_TOKEN"))
+        # Simple page creation - you'll need to configure parent database/page
+        response = await client.post(
+            "/v1/pages",
+            content=orjson.dumps({
+                "parent": {"page_id": request.parent_id} if request.parent_id else {"type": "workspace"},
+                "properties": {
+                    "title": {
+                        "title": [{"text": {"content": request.title}}]
+                    }
                 },
-                json={
-                    "parent": {"page_id": request.parent_id} if request.parent_id else {"type": "workspace"},
-                    "properties": {
-                        "title": {
-                            "title": [{"text": {"content": request.title}}]
+                "children": [
+                    {
+                        "object": "block",
+                        "type": "paragraph",
+                        "paragraph": {
+                            "rich_text": [{"text": {"content": request.content}}]
                         }
-                    },
-                    "children": [
-                        {
-                            "object": "block",
-                            "type": "paragraph",
-                            "paragraph": {
-                                "rich_text": [{"text": {"content": request.content}}]
-                            }
-                        }
-                    ]
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+                    }
+                ]
+            }),
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
     except httpx.HTTPError as e:
         logger.error(f"Notion API error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -111,34 +101,27 @@ class SupabaseQueryRequest(BaseModel):
 @router.post("/supabase/query")
 async def supabase_query(request: SupabaseQueryRequest):
     """Query Supabase table"""
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
+    supabase_url = integration_env("SUPABASE_URL")
+    supabase_key = integration_env("SUPABASE_KEY")
     
     if not supabase_url or not supabase_key:
         raise HTTPException(status_code=400, detail="SUPABASE_URL or SUPABASE_KEY not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Build query URL
-            url = f"{supabase_url}/rest/v1/{request.table}"
-            params = {"limit": request.limit}
-            
-            # Add filters if provided
-            if request.filters:
-                for key, value in request.filters.items():
-                    params[key] = f"eq.{value}"
-            
-            response = await client.get(
-                url,
-                headers={
-                    "apikey": supabase_key,
-                    "Authorization": f"Bearer {supabase_key}"
-                },
-                params=params,
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        client = supabase_client(supabase_url, supabase_key)
+        params = {"limit": request.limit}
+        
+        # Add filters if provided
+        if request.filters:
+            for key, value in request.filters.items():
+                params[key] = f"eq.{value}"
+        
+        response = await with_retry(lambda: client.get(
+            f"/rest/v1/{request.table}",
+            params=params,
+            timeout=30.0
+        ))
+        return orjson.loads(response.content)
     except httpx.HTTPError as e:
         logger.error(f"Supabase API error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -157,31 +140,26 @@ class ExaSearchRequest(BaseModel):
 @router.post("/exa/search")
 async def exa_search(request: ExaSearchRequest):
     """Search using Exa AI"""
-    exa_api_key = os.getenv("EXA_API_KEY")
+    exa_api_key = integration_env("EXA_API_KEY")
     if not exa_api_key:
         raise HTTPException(status_code=400, detail="EXA_API_KEY not configured")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.exa.ai/search",
-                headers={
-                    "x-api-key": exa_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "query": request.query,
-                    "num_results": request.num_results,
-                    "type": request.search_type,
-                    "contents": {
-                        "text": True,
-                        "highlights": True
-                    }
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()
+        client = exa_client(exa_api_key)
+        response = await with_retry(lambda: client.post(
+            "/search",
+            content=orjson.dumps({
+                "query": request.query,
+                "num_results": request.num_results,
+                "type": request.search_type,
+                "contents": {
+                    "text": True,
+                    "highlights": True
+                }
+            }),
+            timeout=30.0
+        ))
+        return orjson.loads(response.content)
     except httpx.HTTPError as e:
         logger.error(f"Exa API error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -195,7 +173,7 @@ async def exa_search(request: ExaSearchRequest):
 async def integrations_status():
     """Check which integrations are configured"""
     return {
-        "notion": bool(os.getenv("NOTION_API_TOKEN")),
-        "supabase": bool(os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY")),
-        "exa": bool(os.getenv("EXA_API_KEY"))
+        "notion": bool(integration_env("NOTION_API_TOKEN")),
+        "supabase": bool(integration_env("SUPABASE_URL") and integration_env("SUPABASE_KEY")),
+        "exa": bool(integration_env("EXA_API_KEY"))
     }
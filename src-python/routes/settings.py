@@ -2,9 +2,33 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Any, Dict, Optional
 import logging
+import sys
 
 logger = logging.getLogger("arrow.routes.settings")
 
+
+def _invalidate_cached_config(category: str, key: Optional[str] = None):
+    """Drop in-process caches derived from a settings category (or key) after it changes."""
+    if category == "cloudflare":
+        try:
+            from cloudflare_client import invalidate_cloudflare_config
+            invalidate_cloudflare_config()
+        except ImportError:
+            pass
+
+    if category == "hotkey":
+        from routes.hotkey import invalidate_hotkey_cache
+        invalidate_hotkey_cache()
+
+    # key=None means a bulk change (import) that may have touched any key
+    from utils.http_clients import INTEGRATION_ENV_KEYS, clear_integration_env
+    if key is None or key in INTEGRATION_ENV_KEYS:
+        clear_integration_env()
+        # Only if the agent tools are loaded; otherwise there is nothing cached
+        integrations = sys.modules.get("tools.integrations")
+        if integrations is not None:
+            integrations.clear_integration_cache()
+
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
@@ -83,6 +107,7 @@ async def set_setting(request: SettingRequest):
             is_secret=request.is_secret,
             description=request.description
         )
+        _invalidate_cached_config(request.category, request.key)
 
         # Reload Tadata if TADATA_API_KEY or TADATA_CONNECTORS changed
         if request.key in ["TADATA_API_KEY", "TADATA_CONNECTORS", "TADATA_NOTION_URL", "TADATA_EXA_URL", "TADATA_SUPABASE_URL"]:
@@ -108,6 +133,7 @@ async def delete_setting(category: str, key: str):
         settings_mgr = get_settings_manager()
         
         settings_mgr.delete(category, key)
+        _invalidate_cached_config(category, key)
         return {
             "success": True,
             "category": category,
@@ -129,6 +155,7 @@ async def import_settings(request: dict):
         category = request.get("category", "env")
         
         count = settings_mgr.import_from_env(env_text, category=category)
+        _invalidate_cached_config(category)
         
         return {
             "success": True,
@@ -0,0 +1,106 @@
+"""
+Tests for the TinyStore knowledge base (tools/rag.py).
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tools.rag as rag
+from tools.rag import EMBEDDING_DIM, EMBEDDING_VERSION, embed
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the global store at a temporary data directory."""
+    monkeypatch.setattr(rag, "_get_data_dir", lambda: tmp_path)
+    monkeypatch.setattr(rag, "_STORE", None)
+    yield tmp_path
+    rag.close_store()
+
+
+def _write_old_format_db(db_path: Path, docs, metadata_json=None):
+    """Create a knowledge base the way releases before embedding versioning did:
+    float64 vectors and no embedding_version column."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE documents (
+            id TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            vec BLOB NOT NULL,
+            source TEXT NOT NULL,
+            filename TEXT,
+            created_at TEXT NOT NULL,
+            metadata TEXT
+        )
+    """)
+    for doc_id, text in docs:
+        old_vec = np.random.rand(EMBEDDING_DIM).astype(float)
+        conn.execute(
+            "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (doc_id, text, old_vec.tobytes(), "manual", None, "2025-10-01T00:00:00",
+             metadata_json or json.dumps({"tag": doc_id}))
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_old_format_db_is_reembedded_on_load(data_dir):
+    db_path = data_dir / "knowledge_base.db"
+    docs = [("a", "my github username is arnxv0"), ("b", "brunch on sunday at nine thirty")]
+    _write_old_format_db(db_path, docs)
+
+    store = rag.get_store()
+    assert sorted(d.id for d in store.docs) == ["a", "b"]
+    for doc_id, text in docs:
+        doc = store.get(doc_id)
+        assert doc.vec.dtype == np.float32
+        assert np.allclose(doc.vec, embed(text))
+        assert doc.metadata == {"tag": doc_id}
+
+    top, score = store.search(embed("github username"), k=1)[0]
+    assert top.id == "a" and score > 0
+    rag.close_store()
+
+    # The new vectors were written back, so the next load doesn't re-embed
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, vec, embedding_version FROM documents ORDER BY id").fetchall()
+    conn.close()
+    for (doc_id, vec_blob, version), (_, text) in zip(rows, docs):
+        assert version == EMBEDDING_VERSION
+        assert np.allclose(np.frombuffer(vec_blob, dtype=np.float32), embed(text))
+
+
+def test_load_failure_is_raised_not_hidden(data_dir):
+    _write_old_format_db(data_dir / "knowledge_base.db", [("a", "some text")], metadata_json="{not json")
+
+    # An unreadable knowledge base must fail loudly rather than come up empty
+    with pytest.raises(Exception):
+        rag.get_store()
+    assert rag._STORE is None
+
+
+def test_add_many_with_repeated_id_keeps_last_copy(data_dir):
+    store = rag.get_store()
+    store.add("a", "first version", embed("first version"))
+    store.add_many([
+        rag.Doc(id="a", text="second version", vec=embed("second version")),
+        rag.Doc(id="b", text="other doc", vec=embed("other doc")),
+        rag.Doc(id="a", text="third version", vec=embed("third version")),
+    ])
+
+    assert sorted(d.id for d in store.docs) == ["a", "b"]
+    assert store.get("a").text == "third version"
+    assert len(store.get_all()) == 2
+    top, _ = store.search(embed("third version"), k=1)[0]
+    assert top.id == "a" and top.text == "third version"
+
+    # Memory and database agree after a reload
+    rag.close_store()
+    store = rag.get_store()
+    assert sorted((d.id, d.text) for d in store.docs) == [("a", "third version"), ("b", "other doc")]
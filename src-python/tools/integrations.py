@@ -3,12 +3,77 @@ Tools for Notion, Supabase, and Exa integrations
 """
 
 from tool_adapter import FunctionTool
-import httpx
-import os
+import asyncio
 import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, List
+import orjson
+from cachetools import TTLCache
+
+from utils.http_clients import notion_client, supabase_client, exa_client, integration_env, with_retry
 
 logger = logging.getLogger("arrow.tools.integrations")
 
+# Batched (*_many) tools: at most this many requests in flight per integration,
+# and at most BATCH_RATE_LIMIT request starts per second
+BATCH_CONCURRENCY = 8
+BATCH_RATE_LIMIT = 10
+
+
+class _RateLimiter:
+    """Sliding-window limiter: at most max_rate acquisitions per time_period seconds."""
+
+    def __init__(self, max_rate: int, time_period: float = 1.0):
+        self._max_rate = max_rate
+        self._time_period = time_period
+        self._starts = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self._starts and now - self._starts[0] >= self._time_period:
+                self._starts.popleft()
+            if len(self._starts) < self._max_rate:
+                self._starts.append(now)
+                return
+            await asyncio.sleep(self._starts[0] + self._time_period - now)
+
+
+# (tool, *args) -> formatted result of a successful call. Lookups and stores happen
+# on the event loop with no await in between, so no lock is needed.
+_RESULT_CACHE = TTLCache(maxsize=1024, ttl=300)
+# Supabase tables mutate, so their rows are only reused briefly
+_SUPABASE_CACHE = TTLCache(maxsize=256, ttl=30)
+
+
+def clear_integration_cache():
+    """Forget cached Notion/Supabase/Exa results."""
+    _RESULT_CACHE.clear()
+    _SUPABASE_CACHE.clear()
+
+
+# integration name -> (concurrency cap, rate limiter), shared by all batches
+_BATCH_LIMITS: Dict[str, tuple] = {}
+
+
+async def _run_many(name: str, items: List[str], run: Callable[[str], Awaitable[str]]) -> str:
+    """Run one tool call per item concurrently under the integration's limits and join the results."""
+    items = list(dict.fromkeys(items))  # drop duplicates, keep order
+    if not items:
+        return "❌ Nothing to search for."
+
+    if name not in _BATCH_LIMITS:
+        _BATCH_LIMITS[name] = (asyncio.Semaphore(BATCH_CONCURRENCY), _RateLimiter(BATCH_RATE_LIMIT))
+    semaphore, limiter = _BATCH_LIMITS[name]
+
+    async def limited(item: str) -> str:
+        async with semaphore:
+            await limiter.acquire()
+            return await run(item)
+
+    results = await asyncio.gather(*(limited(item) for item in items))
+    return "\n\n".join(f"### {item}\n{result}" for item, result in zip(items, results))
 
 # ============================================
 # NOTION TOOLS
@@ -22,28 +87,27 @@ async def notion_search(query: str) -> str:
     Args:
         query: Search query to find in Notion workspace
     """
-    notion_token = os.getenv("NOTION_API_TOKEN")
+    notion_token = integration_env("NOTION_API_TOKEN")
     if not notion_token:
         return "❌ Notion not configured. Add NOTION_API_TOKEN to settings."
-    
+
+    cache_key = ("notion_search", query)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.notion.com/v1/search",
-                headers={
-                    "Authorization": f"Bearer {notion_token}",
-                    "Notion-Version": "2022-06-28",
-                    "Content-Type": "application/json"
-                },
-                json={"query": query},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data.get("results"):
-                return f"No results found for: {query}"
-            
+        client = notion_client(notion_token)
+        response = await with_retry(lambda: client.post(
+            "/v1/search",
+            content=orjson.dumps({"query": query}),
+            timeout=30.0
+        ))
+        data = orjson.loads(response.content)
+
+        if not data.get("results"):
+            result = f"No results found for: {query}"
+        else:
             # Format results
             results = []
             for item in data["results"][:5]:  # Top 5 results
@@ -51,15 +115,29 @@ async def notion_search(query: str) -> str:
                 if item.get("properties", {}).get("title", {}).get("title"):
                     title = item["properties"]["title"]["title"][0]["plain_text"]
                 results.append(f"• {title} ({item.get('url', 'No URL')})")
-            
-            return f"Found {len(data['results'])} results:\n" + "\n".join(results)
-            
+            result = f"Found {len(data['results'])} results:\n" + "\n".join(results)
+
+        _RESULT_CACHE[cache_key] = result
+        return result
+
     except Exception as e:
         logger.error(f"Notion search error: {e}")
         return f"❌ Notion search failed: {str(e)}"
 
 
+async def notion_search_many(queries: list[str]) -> str:
+    """
+    Run several Notion searches at once.
+    Use this instead of repeated notion_search calls when you need more than one query.
+
+    Args:
+        queries: List of search queries
+    """
+    return await _run_many("notion", queries, notion_search)
+
+
 NotionSearchTool = FunctionTool(notion_search)
+NotionSearchManyTool = FunctionTool(notion_search_many)
 
 
 # ============================================
@@ -75,43 +153,63 @@ async def supabase_query(table: str, limit: int = 10) -> str:
         table: Table name to query (e.g., 'users', 'products', 'orders')
         limit: Maximum number of rows to return (default: 10)
     """
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
+    supabase_url = integration_env("SUPABASE_URL")
+    supabase_key = integration_env("SUPABASE_KEY")
     
     if not supabase_url or not supabase_key:
         return "❌ Supabase not configured. Add SUPABASE_URL and SUPABASE_KEY to settings."
-    
+
+    cache_key = ("supabase_query", table, limit)
+    cached = _SUPABASE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{supabase_url}/rest/v1/{table}",
-                headers={
-                    "apikey": supabase_key,
-                    "Authorization": f"Bearer {supabase_key}"
-                },
-                params={"limit": limit},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data:
-                return f"No data found in table: {table}"
-            
-            return f"✅ Retrieved {len(data)} rows from '{table}':\n{data[:3]}"  # Show first 3 rows
-            
+        client = supabase_client(supabase_url, supabase_key)
+        response = await with_retry(lambda: client.get(
+            f"/rest/v1/{table}",
+            params={"limit": limit},
+            timeout=30.0
+        ))
+        data = orjson.loads(response.content)
+
+        if not data:
+            result = f"No data found in table: {table}"
+        else:
+            result = f"✅ Retrieved {len(data)} rows from '{table}':\n{data[:3]}"  # Show first 3 rows
+
+        _SUPABASE_CACHE[cache_key] = result
+        return result
+
     except Exception as e:
         logger.error(f"Supabase query error: {e}")
         return f"❌ Supabase query failed: {str(e)}"
 
 
+async def supabase_query_many(tables: list[str], limit: int = 10) -> str:
+    """
+    Query several Supabase tables at once.
+    Use this instead of repeated supabase_query calls when you need more than one table.
+
+    Args:
+        tables: List of table names to query
+        limit: Maximum number of rows to return per table (default: 10)
+    """
+    return await _run_many("supabase", tables, lambda table: supabase_query(table, limit))
+
+
 SupabaseQueryTool = FunctionTool(supabase_query)
+SupabaseQueryManyTool = FunctionTool(supabase_query_many)
 
 
 # ============================================
 # EXA TOOLS
 # ============================================
 
+# Characters of page text shown per Exa result
+EXA_SNIPPET_CHARS = 200
+
+
 async def exa_search(query: str, num_results: int = 5) -> str:
     """
     Search the web using Exa AI for high-quality, semantic results. 
@@ -121,48 +219,63 @@ async def exa_search(query: str, num_results: int = 5) -> str:
         query: Search query (use natural language)
         num_results: Number of results to return (default: 5)
     """
-    exa_api_key = os.getenv("EXA_API_KEY")
+    exa_api_key = integration_env("EXA_API_KEY")
     if not exa_api_key:
         return "❌ Exa not configured. Add EXA_API_KEY to settings."
-    
+
+    cache_key = ("exa_search", query, num_results)
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.exa.ai/search",
-                headers={
-                    "x-api-key": exa_api_key,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "query": query,
-                    "num_results": num_results,
-                    "type": "neural",
-                    "contents": {
-                        "text": True,
-                        "highlights": True
-                    }
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data.get("results"):
-                return f"No results found for: {query}"
-            
+        client = exa_client(exa_api_key)
+        response = await with_retry(lambda: client.post(
+            "/search",
+            content=orjson.dumps({
+                "query": query,
+                "num_results": num_results,
+                "type": "neural",
+                "contents": {
+                    # Only the first EXA_SNIPPET_CHARS are shown, so don't download full pages
+                    "text": {"maxCharacters": EXA_SNIPPET_CHARS},
+                    "highlights": True
+                }
+            }),
+            timeout=30.0
+        ))
+        data = orjson.loads(response.content)
+
+        if not data.get("results"):
+            result = f"No results found for: {query}"
+        else:
             # Format results
-            results = []
-            for item in data["results"]:
-                title = item.get("title", "No title")
-                url = item.get("url", "")
-                snippet = item.get("text", "")[:200] + "..." if item.get("text") else ""
-                results.append(f"• **{title}**\n  {url}\n  {snippet}")
-            
-            return f"🔍 Exa found {len(data['results'])} results:\n\n" + "\n\n".join(results)
-            
+            results = [
+                f"• **{item.get('title', 'No title')}**\n  {item.get('url', '')}\n  "
+                f"{item['text'][:EXA_SNIPPET_CHARS] + '...' if item.get('text') else ''}"
+                for item in data["results"]
+            ]
+            result = f"🔍 Exa found {len(data['results'])} results:\n\n" + "\n\n".join(results)
+
+        _RESULT_CACHE[cache_key] = result
+        return result
+
     except Exception as e:
         logger.error(f"Exa search error: {e}")
         return f"❌ Exa search failed: {str(e)}"
 
 
+async def exa_search_many(queries: list[str], num_results: int = 5) -> str:
+    """
+    Run several Exa web searches at once.
+    Use this instead of repeated exa_search calls when researching more than one query.
+
+    Args:
+        queries: List of search queries (use natural language)
+        num_results: Number of results to return per query (default: 5)
+    """
+    return await _run_many("exa", queries, lambda query: exa_search(query, num_results))
+
+
 ExaSearchTool = FunctionTool(exa_search)
+ExaSearchManyTool = FunctionTool(exa_search_many)
@@ -3,7 +3,10 @@ import numpy as np
 from dataclasses import dataclass, asdict
 from tool_adapter import FunctionTool
 import sqlite3
-import json
+import threading
+import functools
+import hashlib
+import orjson
 import uuid
 from datetime import datetime
 import os
@@ -11,6 +14,13 @@ from pathlib import Path
 
 # Constants
 EMBEDDING_DIM = 100  # Fixed dimension for all embeddings
+# Bump when embed() output changes; rows stored with another version are re-embedded on load
+# 2: float32, unit-normalized; 3: blake2s token hashing
+EMBEDDING_VERSION = 3
+# Rows fetched per round trip when loading the store
+LOAD_BATCH_SIZE = 1024
+# Compact TinyStore once deleted (tombstoned) rows exceed this fraction of all rows
+COMPACT_RATIO = 0.25
 
 # Enhanced document with metadata
 @dataclass
@@ -48,33 +58,106 @@ def _get_data_dir() -> Path:
     return data_dir
 
 
+# Embeddings: simple bag-of-words with fixed dimensions to avoid mismatches
+# (defined before TinyStore, which re-embeds outdated rows while loading)
+
+def _normalize(vec: np.ndarray) -> np.ndarray:
+    """Return vec (or each row of a 2-D array) as unit-length float32 (zero vectors stay zero)"""
+    vec = np.asarray(vec, dtype=np.float32)
+    norms = np.linalg.norm(vec, axis=-1, keepdims=True)
+    # Masked divide instead of a per-vector zero check
+    return np.divide(vec, norms, out=np.zeros_like(vec), where=norms > 0)
+
+
+@functools.lru_cache(maxsize=65536)
+def _token_index(token: str) -> int:
+    """Position of a token in the embedding vector.
+    
+    Uses blake2s rather than the builtin hash(), which is salted per process:
+    the same text must embed identically across restarts so stored vectors stay
+    comparable with new queries (and are never re-embedded needlessly).
+    """
+    return int.from_bytes(hashlib.blake2s(token.encode(), digest_size=4).digest(), "little") % EMBEDDING_DIM
+
+
+def embed(text: str) -> np.ndarray:
+    """Create a simple fixed-dimension embedding from text using hash-based features"""
+    tokens = text.lower().split()
+    
+    # Map each token to a position in the fixed vector with a stable hash
+    indices = np.fromiter(map(_token_index, tokens), dtype=np.intp, count=len(tokens))
+    # Token counts per position in one C pass
+    vec = np.bincount(indices, minlength=EMBEDDING_DIM).astype(np.float32)
+    
+    # Normalize the vector (stored and compared as unit-length float32)
+    return _normalize(vec)
+
+
+def _view_entry(d: Doc) -> Dict[str, Any]:
+    """Serializable summary of a document for TinyStore.get_all()"""
+    return {
+        "id": d.id,
+        "text": d.text,
+        "source": d.source,
+        "filename": d.filename,
+        "created_at": d.created_at,
+        "metadata": d.metadata,
+        "preview": d.text[:200] + "..." if len(d.text) > 200 else d.text
+    }
+
+
 class TinyStore:
     def __init__(self, db_path: str = None):
-        self.docs: List[Doc] = []
+        # Row i of _matrix holds _rows[i].vec (unit-normalized float32), so search is one
+        # mat-vec product. Deleted rows become tombstones (None / _live False) until compaction.
+        self._rows: List[Optional[Doc]] = []
+        self._matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._tombstones = 0
+        # doc id -> row index
+        self._index: Dict[str, int] = {}
+        # get_all() entries, row-aligned with _rows
+        self._view_rows: List[Optional[Dict[str, Any]]] = []
+        # Live docs / get_all() entries; None after a delete until next accessed
+        self._docs: Optional[List[Doc]] = []
+        self._view: Optional[List[Dict[str, Any]]] = []
         # Use default path in app data directory if not specified
         if db_path is None:
             db_path = str(_get_data_dir() / "knowledge_base.db")
         self.db_path = db_path
-        self._init_db()
-        self._load_from_db()
+        # One connection for the store's lifetime (WAL, shared across threads behind _lock)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        try:
+            self._init_db()
+            self._load_from_db()
+        except Exception:
+            self._conn.close()
+            raise
 
     def _init_db(self):
         """Initialize SQLite database for persistent storage"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS documents (
-                id TEXT PRIMARY KEY,
-                text TEXT NOT NULL,
-                vec BLOB NOT NULL,
-                source TEXT NOT NULL,
-                filename TEXT,
-                created_at TEXT NOT NULL,
-                metadata TEXT
-            )
-        """)
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    vec BLOB NOT NULL,
+                    source TEXT NOT NULL,
+                    filename TEXT,
+                    created_at TEXT NOT NULL,
+                    metadata TEXT,
+                    embedding_version INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            # Databases created before embedding versioning lack the column
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(documents)")}
+            if "embedding_version" not in columns:
+                cursor.execute("ALTER TABLE documents ADD COLUMN embedding_version INTEGER NOT NULL DEFAULT 1")
 
     def _load_from_db(self):
         """Load all documents from database into memory"""
@@ -84,43 +167,59 @@ class TinyStore:
         logger.info(f"📖 Loading documents from database: {self.db_path}")
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, text, vec, source, filename, created_at, metadata FROM documents")
-            rows = cursor.fetchall()
-            
-            logger.info(f"📖 Found {len(rows)} documents in database")
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT id, text, vec, source, filename, created_at, metadata, embedding_version FROM documents")
             
+            docs = []
             needs_reembedding = []
+            # One (n, EMBEDDING_DIM) block per batch of current rows, stacked once at the end
+            blocks = []
             
-            for row in rows:
-                doc_id, text, vec_blob, source, filename, created_at, metadata_json = row
-                vec = np.frombuffer(vec_blob, dtype=float)
-                metadata = json.loads(metadata_json) if metadata_json else {}
+            # Bounded batches instead of fetchall(), so a large store isn't held twice in memory
+            while True:
+                chunk = cursor.fetchmany(LOAD_BATCH_SIZE)
+                if not chunk:
+                    break
+                
+                current = []
+                for row in chunk:
+                    doc_id, text, vec_blob, source, filename, created_at, metadata_json, version = row
+                    # Embeddings are deterministic, so only rows from an older embed() need redoing
+                    if version != EMBEDDING_VERSION or len(vec_blob) != EMBEDDING_DIM * 4:
+                        logger.warning(f"⚠️  Document {doc_id[:8]}... has embedding v{version}, will re-embed as v{EMBEDDING_VERSION}")
+                        metadata = orjson.loads(metadata_json) if metadata_json else {}
+                        needs_reembedding.append((doc_id, text, source, filename, created_at, metadata))
+                    else:
+                        current.append(row)
                 
-                # Check if vector has correct dimension
-                if len(vec) != EMBEDDING_DIM:
-                    logger.warning(f"⚠️  Document {doc_id[:8]}... has wrong dimension ({len(vec)} vs {EMBEDDING_DIM}), will re-embed")
-                    needs_reembedding.append((doc_id, text, source, filename, created_at, metadata))
+                if not current:
                     continue
                 
-                self.docs.append(Doc(
-                    id=doc_id,
-                    text=text,
-                    vec=vec,
-                    source=source,
-                    filename=filename,
-                    created_at=created_at,
-                    metadata=metadata
-                ))
-                logger.info(f"✅ Loaded document: {filename or doc_id[:8]}... (source: {source})")
+                # Decode the whole batch of vectors with one frombuffer; each doc gets a row view
+                mat = np.frombuffer(b"".join(row[2] for row in current), dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+                blocks.append(mat)
+                for (doc_id, text, _, source, filename, created_at, metadata_json, _), vec in zip(current, mat):
+                    docs.append(Doc(
+                        id=doc_id,
+                        text=text,
+                        vec=vec,
+                        source=source,
+                        filename=filename,
+                        created_at=created_at,
+                        metadata=orjson.loads(metadata_json) if metadata_json else {}
+                    ))
             
-            # Re-embed documents with wrong dimensions
+            logger.info(f"📖 Found {len(docs) + len(needs_reembedding)} documents in database")
+            
+            # Re-embed documents from an older embedding version
             if needs_reembedding:
                 logger.info(f"🔄 Re-embedding {len(needs_reembedding)} documents with new embeddings...")
+                updates = []
+                new_vecs = []
                 for doc_id, text, source, filename, created_at, metadata in needs_reembedding:
                     new_vec = embed(text)
-                    self.docs.append(Doc(
+                    new_vecs.append(new_vec)
+                    docs.append(Doc(
                         id=doc_id,
                         text=text,
                         vec=new_vec,
@@ -129,133 +228,196 @@ class TinyStore:
                         created_at=created_at,
                         metadata=metadata
                     ))
-                    # Update in database
-                    cursor.execute("""
-                        UPDATE documents SET vec = ? WHERE id = ?
-                    """, (new_vec.tobytes(), doc_id))
-                    logger.info(f"✅ Re-embedded document: {filename or doc_id[:8]}...")
+                    updates.append((new_vec.tobytes(), EMBEDDING_VERSION, doc_id))
                 
-                conn.commit()
+                # Update in database (one transaction)
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._conn.executemany("""
+                        UPDATE documents SET vec = ?, embedding_version = ? WHERE id = ?
+                    """, updates)
                 logger.info(f"✅ Updated {len(needs_reembedding)} documents with new embeddings")
             
-            conn.close()
+                blocks.append(np.vstack(new_vecs))
+            
+            self._reset(docs, np.vstack(blocks) if blocks else None)
             logger.info(f"📖 Loaded {len(self.docs)} documents into memory")
         except Exception as e:
+            # Serving an empty store would silently hide the user's knowledge base
             logger.error(f"❌ Error loading from database: {e}")
-            import traceback
-            traceback.print_exc()
+            raise
 
     def add(self, id: str, text: str, vec: np.ndarray, source: str = "manual", 
             filename: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
         """Add document to both memory and database"""
-        doc = Doc(
+        self.add_many([Doc(
             id=id,
             text=text,
             vec=vec,
             source=source,
             filename=filename,
             metadata=metadata or {}
-        )
-        self.docs.append(doc)
+        )])
+
+    def add_many(self, docs: List[Doc]):
+        """Add several documents to memory and database in a single transaction"""
+        if not docs:
+            return
+        # A repeated id keeps its last copy, as INSERT OR REPLACE does in the database
+        docs = list({doc.id: doc for doc in docs}.values())
         
-        # Save to database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO documents (id, text, vec, source, filename, created_at, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        # Normalize the whole batch at once; each doc keeps a row of the result
+        mat = _normalize(np.vstack([doc.vec for doc in docs]))
+        for doc, vec in zip(docs, mat):
+            doc.vec = vec
+        rows = [(
             doc.id,
             doc.text,
-            vec.tobytes(),
+            doc.vec.tobytes(),
             doc.source,
             doc.filename,
             doc.created_at,
-            json.dumps(doc.metadata)
-        ))
-        conn.commit()
-        conn.close()
+            orjson.dumps(doc.metadata).decode(),
+            EMBEDDING_VERSION
+        ) for doc in docs]
+        views = [_view_entry(doc) for doc in docs]
+        
+        with self._lock:
+            # Build the new arrays first, so nothing that can fail runs after the commit
+            matrix = np.vstack([self._matrix, mat])
+            live = np.concatenate([self._live, np.ones(len(docs), dtype=bool)])
+            
+            # Save to database
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("""
+                    INSERT OR REPLACE INTO documents (id, text, vec, source, filename, created_at, metadata, embedding_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+            
+            self._matrix = matrix
+            self._live = live
+            start = len(self._rows)
+            for offset, doc in enumerate(docs):
+                # INSERT OR REPLACE: an existing id's old row becomes a tombstone
+                old = self._index.get(doc.id)
+                if old is not None:
+                    self._tombstone(old)
+                self._index[doc.id] = start + offset
+            self._rows.extend(docs)
+            self._view_rows.extend(views)
+            # Appends keep the cached lists valid (a replacement above already dropped them)
+            if self._docs is not None:
+                self._docs.extend(docs)
+            if self._view is not None:
+                self._view.extend(views)
+            self._maybe_compact()
 
     def delete(self, doc_id: str) -> bool:
         """Delete document from both memory and database"""
-        # Remove from memory
-        self.docs = [d for d in self.docs if d.id != doc_id]
-        
-        # Remove from database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
-        return deleted
+        with self._lock:
+            # Remove from memory: O(1) tombstone, compacted in bulk later
+            row = self._index.pop(doc_id, None)
+            if row is not None:
+                self._tombstone(row)
+                self._maybe_compact()
+            
+            # Remove from database
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            return cursor.rowcount > 0
+
+    def get(self, doc_id: str) -> Optional[Doc]:
+        """Look up a document by id"""
+        row = self._index.get(doc_id)
+        return None if row is None else self._rows[row]
+
+    @property
+    def docs(self) -> List[Doc]:
+        """Live documents in insertion order (shared list - do not mutate it)"""
+        docs = self._docs
+        if docs is None:
+            docs = self._docs = [d for d in self._rows if d is not None]
+        return docs
+
+    def _tombstone(self, row: int):
+        """Mark a row deleted without reshaping the matrix"""
+        self._rows[row] = None
+        self._view_rows[row] = None
+        self._live[row] = False
+        self._tombstones += 1
+        self._docs = None
+        self._view = None
+
+    def _maybe_compact(self):
+        """Drop tombstoned rows once they exceed COMPACT_RATIO of the store"""
+        if self._tombstones > len(self._rows) * COMPACT_RATIO:
+            self._reset(
+                [d for d in self._rows if d is not None],
+                self._matrix[self._live],
+                [v for v in self._view_rows if v is not None]
+            )
+
+    def _reset(self, docs: List[Doc], matrix: Optional[np.ndarray] = None,
+               views: Optional[List[Dict[str, Any]]] = None):
+        """Replace the in-memory rows with docs (matrix/views are built if not given)"""
+        if matrix is None:
+            if docs:
+                matrix = np.vstack([d.vec for d in docs])
+            else:
+                matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._rows = list(docs)
+        self._matrix = matrix
+        self._live = np.ones(len(docs), dtype=bool)
+        self._tombstones = 0
+        self._index = {d.id: i for i, d in enumerate(docs)}
+        self._view_rows = views if views is not None else [_view_entry(d) for d in docs]
+        self._docs = None
+        self._view = None
 
     def get_all(self) -> List[Dict[str, Any]]:
-        """Get all documents with metadata"""
-        return [{
-            "id": d.id,
-            "text": d.text,
-            "source": d.source,
-            "filename": d.filename,
-            "created_at": d.created_at,
-            "metadata": d.metadata,
-            "preview": d.text[:200] + "..." if len(d.text) > 200 else d.text
-        } for d in self.docs]
+        """Get all documents with metadata (entries are shared - do not mutate them)"""
+        view = self._view
+        if view is None:
+            view = self._view = [v for v in self._view_rows if v is not None]
+        return list(view)
 
     def search(self, qvec: np.ndarray, k: int = 5):
-        if not self.docs:
+        if not self._index:
             return []
         
-        # All vectors now have same dimension (EMBEDDING_DIM)
-        sims = []
-        for d in self.docs:
-            q_norm = np.linalg.norm(qvec)
-            d_norm = np.linalg.norm(d.vec)
-            
-            if q_norm == 0 or d_norm == 0:
-                sims.append(0.0)
-            else:
-                # Cosine similarity
-                sim = float(qvec @ d.vec / (q_norm * d_norm))
-                sims.append(sim)
+        # Same-length snapshot in case a concurrent add swaps in larger arrays
+        matrix, live, rows = self._matrix, self._live, self._rows
+        n = min(len(matrix), len(live))
         
-        topk = np.argsort(sims)[::-1][:k]
-        return [(self.docs[i], sims[i]) for i in topk]
+        # Stored vectors are unit length, so cosine similarity is a plain dot product
+        sims = matrix[:n] @ _normalize(qvec)
+        sims[~live[:n]] = -np.inf  # tombstoned rows
+        
+        # O(N) partial selection of the k best, then sort only those
+        k = min(k, int(np.count_nonzero(live[:n])))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-sims, k - 1)[:k]
+        topk = idx[np.argsort(-sims[idx])]
+        # A row can be tombstoned by a concurrent delete after the snapshot
+        return [(rows[i], float(sims[i])) for i in topk if rows[i] is not None]
 
     def clear(self):
         """Clear all documents"""
-        self.docs = []
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM documents")
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._reset([])
+            with self._conn:
+                self._conn.execute("DELETE FROM documents")
 
+    def close(self):
+        """Close the database connection (called on app shutdown)"""
+        with self._lock:
+            self._conn.close()
 
-STORE = TinyStore()
 
-
-# Embeddings: simple bag-of-words with fixed dimensions to avoid mismatches
-# (Already defined at top of file)
-
-def embed(text: str) -> np.ndarray:
-    """Create a simple fixed-dimension embedding from text using hash-based features"""
-    tokens = text.lower().split()
-    
-    # Create a fixed-size vector using hash-based feature mapping
-    vec = np.zeros(EMBEDDING_DIM, dtype=float)
-    
-    for token in tokens:
-        # Use hash to map token to a position in the fixed vector
-        idx = hash(token) % EMBEDDING_DIM
-        vec[idx] += 1.0
-    
-    # Normalize the vector
-    norm = np.linalg.norm(vec)
-    if norm > 0:
-        vec = vec / norm
-    
-    return vec
+_STORE: Optional[TinyStore] = None
+_STORE_LOCK = threading.Lock()
 
 
 # API functions for the agent
@@ -264,8 +426,9 @@ async def rag_add(id: str, text: str, source: str = "manual",
     """Add a document to the knowledge base"""
     if not id:
         id = str(uuid.uuid4())
-    STORE.add(id, text, embed(text), source=source, filename=filename)
-    return {"status": "ok", "id": id, "count": len(STORE.docs)}
+    store = get_store()
+    store.add(id, text, embed(text), source=source, filename=filename)
+    return {"status": "ok", "id": id, "count": len(store.docs)}
 
 
 async def rag_query(query: str, k: int = 5) -> Dict[str, Any]:
@@ -273,9 +436,10 @@ async def rag_query(query: str, k: int = 5) -> Dict[str, Any]:
     import logging
     logger = logging.getLogger("arrow.tools.rag")
     
-    logger.info(f"🔍 RAG Query: '{query}' (searching {len(STORE.docs)} documents)")
+    store = get_store()
+    logger.info(f"🔍 RAG Query: '{query}' (searching {len(store.docs)} documents)")
     
-    results = STORE.search(embed(query), k=k)
+    results = store.search(embed(query), k=k)
     
     logger.info(f"📊 Found {len(results)} results")
     for i, (d, score) in enumerate(results[:3]):  # Log top 3
@@ -295,8 +459,22 @@ async def rag_query(query: str, k: int = 5) -> Dict[str, Any]:
 
 # Export store for direct access
 def get_store() -> TinyStore:
-    """Get the global store instance"""
-    return STORE
+    """Get the global store instance, opening it on first use"""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = TinyStore()
+    return _STORE
+
+
+def close_store():
+    """Close the global store if it was opened (called on app shutdown)"""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+            _STORE = None
 
 
 RagAddTool = FunctionTool(func=rag_add)
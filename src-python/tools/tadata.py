@@ -33,9 +33,11 @@ class TadataMCPClient:
             from utils.settings_manager import get_settings_manager
             settings_mgr = get_settings_manager()
 
-            notion_url = settings_mgr.get("integrations", "TADATA_NOTION_URL")
-            exa_url = settings_mgr.get("integrations", "TADATA_EXA_URL")
-            supabase_url = settings_mgr.get("integrations", "TADATA_SUPABASE_URL")
+            # One query for the whole category instead of one per URL
+            integrations = settings_mgr.get_category("integrations", include_secrets=True, decrypt_secrets=True)
+            notion_url = integrations.get("TADATA_NOTION_URL")
+            exa_url = integrations.get("TADATA_EXA_URL")
+            supabase_url = integrations.get("TADATA_SUPABASE_URL")
 
             if notion_url:
                 servers["notion"] = {
@@ -182,6 +184,10 @@ class TadataMCPClient:
 # Global instance
 _tadata_client: Optional[TadataMCPClient] = None
 
+# Tools the last reload added to the Coordinator, so the next one removes exactly
+# those (local tools such as notion_search share the server names)
+_coordinator_tadata_tools: List[Any] = []
+
 
 def get_tadata_integration() -> TadataMCPClient:
     """Get or create global Tadata MCP client instance"""
@@ -195,7 +201,7 @@ def get_tadata_integration() -> TadataMCPClient:
 
 async def reload_tadata_integration_async():
     """Async version - actually connects and fetches tools"""
-    global _tadata_client
+    global _tadata_client, _coordinator_tadata_tools
 
     if _tadata_client is not None:
         _tadata_client.reload()
@@ -210,19 +216,16 @@ async def reload_tadata_integration_async():
     try:
         from agents.coordinator import Coordinator
 
-        # Remove old Tadata tools (LangChain tools have 'name' attribute)
-        Coordinator.tools = [
-            tool for tool in Coordinator.tools
-            if not (hasattr(tool, 'name') and any(
-                server in getattr(tool, 'name', '')
-                for server in ['notion', 'exa', 'supabase', 'tadata']
-            ))
-        ]
+        # Remove the Tadata tools added by the previous reload (by identity, not name)
+        previous = {id(tool) for tool in _coordinator_tadata_tools}
+        Coordinator.tools = [tool for tool in Coordinator.tools if id(tool) not in previous]
+        _coordinator_tadata_tools = []
 
         # Add new Tadata tools
         if _tadata_client.is_configured():
             tadata_tools = _tadata_client.get_tools()
             Coordinator.tools.extend(tadata_tools)
+            _coordinator_tadata_tools = list(tadata_tools)
             logger.info(f"✅ Reloaded Coordinator with {len(tadata_tools)} Tadata tools")
 
             # Print tools for debugging
@@ -238,6 +241,9 @@ async def reload_tadata_integration_async():
         else:
             logger.info("ℹ️  No Tadata tools configured")
 
+        # Tool list changed - refresh the cached tool map and system prompt
+        Coordinator.invalidate_system_prompt()
+
     except Exception as e:
         logger.error(f"Failed to update Coordinator tools: {e}")
         import traceback
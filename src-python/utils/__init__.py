@@ -4,7 +4,7 @@ from .accessibility import AccessibilityManager
 from .clipboard_manager import ClipboardManager
 from .keyboard_monitor import KeyboardMonitor
 from .screenshot_handler import ScreenshotHandler
-from .settings_manager import get_settings_manager
+from .settings_manager import get_settings_manager, get_all_settings_cached, is_settings_db_ready
 
 __all__ = [
     'AccessibilityManager',
@@ -12,4 +12,6 @@ __all__ = [
     'KeyboardMonitor',
     'ScreenshotHandler',
     'get_settings_manager',
+    'get_all_settings_cached',
+    'is_settings_db_ready',
 ]
@@ -0,0 +1,171 @@
+"""
+Shared per-origin HTTP clients for the Notion, Supabase and Exa integrations.
+
+Each origin gets one pooled HTTP/2 client with its base URL and auth headers
+preloaded, shared by the integration routes and the agent tools. A client is
+rebuilt when the credential it was created with changes.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import random
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import httpx
+
+logger = logging.getLogger("arrow.utils.http_clients")
+
+NOTION_BASE_URL = "https://api.notion.com"
+EXA_BASE_URL = "https://api.exa.ai"
+
+# Environment variables holding integration credentials (see integration_env)
+INTEGRATION_ENV_KEYS = frozenset({"NOTION_API_TOKEN", "SUPABASE_URL", "SUPABASE_KEY", "EXA_API_KEY"})
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# base_url -> (credential the client was built with, client)
+_CLIENTS: Dict[str, Tuple[str, httpx.AsyncClient]] = {}
+
+# Close tasks for clients retired after a credential change (kept so they aren't GC'd)
+_RETIRING: Set[asyncio.Task] = set()
+
+
+@functools.lru_cache(maxsize=None)
+def integration_env(name: str) -> Optional[str]:
+    """os.getenv for integration credentials, cached until clear_integration_env()."""
+    return os.getenv(name)
+
+
+def clear_integration_env():
+    """Forget cached integration credentials (called when settings change)."""
+    integration_env.cache_clear()
+
+
+def get_host_client(
+    base_url: str,
+    credential: str,
+    build_headers: Callable[[], Dict[str, str]]
+) -> httpx.AsyncClient:
+    """
+    Return the shared client for an origin, creating it on first use.
+
+    Args:
+        base_url: Origin the client is bound to (e.g. "https://api.notion.com")
+        credential: Token/key the headers are derived from; a different value rebuilds the client
+        build_headers: Called only when (re)building, returns the default headers
+    """
+    entry = _CLIENTS.get(base_url)
+    if entry is not None:
+        old_credential, client = entry
+        if old_credential == credential and not client.is_closed:
+            return client
+        if not client.is_closed:
+            _retire(client)
+
+    client = httpx.AsyncClient(
+        base_url=base_url,
+        headers=build_headers(),
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+    _CLIENTS[base_url] = (credential, client)
+    logger.info(f"Created HTTP client for {base_url}")
+    return client
+
+
+def notion_client(token: str) -> httpx.AsyncClient:
+    """Shared Notion client with auth and API version headers preloaded."""
+    return get_host_client(NOTION_BASE_URL, token, lambda: {
+        "Authorization": f"Bearer {token}",
+        "Notion-Version": "2022-06-28",
+        "Content-Type": "application/json"
+    })
+
+
+def supabase_client(supabase_url: str, supabase_key: str) -> httpx.AsyncClient:
+    """Shared client for a Supabase project with its API key preloaded."""
+    return get_host_client(supabase_url.rstrip("/"), supabase_key, lambda: {
+        "apikey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}"
+    })
+
+
+def exa_client(api_key: str) -> httpx.AsyncClient:
+    """Shared Exa client with its API key preloaded."""
+    return get_host_client(EXA_BASE_URL, api_key, lambda: {
+        "x-api-key": api_key,
+        "Content-Type": "application/json"
+    })
+
+
+def _retire(client: httpx.AsyncClient):
+    """Close a replaced client in the background without blocking the caller."""
+    try:
+        task = asyncio.get_running_loop().create_task(client.aclose())
+    except RuntimeError:
+        # No running loop; the client is dropped and its sockets closed on GC
+        return
+    _RETIRING.add(task)
+    task.add_done_callback(_RETIRING.discard)
+
+
+async def close_host_clients() -> None:
+    """Close every shared integration client (called on app shutdown)."""
+    clients = [client for _, client in _CLIENTS.values()]
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+async def with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    max_retries: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+    jitter: float = 0.5
+) -> httpx.Response:
+    """
+    Run an idempotent request, retrying transient failures with exponential backoff.
+
+    Retries transport errors and RETRY_STATUS_CODES responses, honouring Retry-After
+    (in seconds) when the server sends one. The returned response has already passed
+    raise_for_status(); the last error is re-raised once retries run out.
+
+    Args:
+        send: Zero-arg callable that performs the request, e.g. lambda: client.get(...)
+        max_retries: Retries after the first attempt
+        base: Delay before the first retry (doubles each attempt)
+        cap: Upper bound for a single delay
+        jitter: Max extra fraction of the delay added at random
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = await send()
+            response.raise_for_status()
+            return response
+        except httpx.HTTPStatusError as e:
+            if attempt == max_retries or e.response.status_code not in RETRY_STATUS_CODES:
+                raise
+            delay = _backoff(attempt, base, cap, jitter)
+            retry_after = e.response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    delay = min(cap, float(retry_after))
+                except ValueError:
+                    pass  # HTTP-date form; keep the computed backoff
+            logger.warning(f"HTTP {e.response.status_code} from {e.request.url.host}, retrying in {delay:.1f}s")
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            delay = _backoff(attempt, base, cap, jitter)
+            logger.warning(f"{type(e).__name__}: {e}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def _backoff(attempt: int, base: float, cap: float, jitter: float) -> float:
+    """Exponential backoff with multiplicative jitter."""
+    return min(cap, base * 2 ** attempt) * (1 + random.random() * jitter)
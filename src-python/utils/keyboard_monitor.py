@@ -270,35 +270,9 @@ class KeyboardMonitor:
         
         print(f"📤 Sending message: {message}", flush=True)
         
-        # Since we're in a different thread (pynput's thread), we need to schedule
-        # the async operations in the main event loop
-        import threading
-        
-        def send_to_all():
-            """Send message to all connections"""
-            connections = self.connection_manager.get_all()
-            print(f"🔄 [WebSocket Thread] Starting send_to_all with {len(connections)} connections", flush=True)
-            for i, connection in enumerate(connections):
-                try:
-                    print(f"📡 [WebSocket] Sending to connection {i+1}...", flush=True)
-                    print(f"📡 [WebSocket] Creating new event loop...", flush=True)
-                    loop = asyncio.new_event_loop()
-                    print(f"📡 [WebSocket] Setting event loop...", flush=True)
-                    asyncio.set_event_loop(loop)
-                    print(f"📡 [WebSocket] Running send_json...", flush=True)
-                    loop.run_until_complete(connection.send_json(message))
-                    print(f"📡 [WebSocket] Closing loop...", flush=True)
-                    loop.close()
-                    print(f"✅ [WebSocket] Sent to connection {i+1}", flush=True)
-                except Exception as e:
-                    print(f"❌ [WebSocket] Failed to send to connection {i+1}: {e}", flush=True)
-                    import traceback
-                    traceback.print_exc()
-            print(f"🔄 [WebSocket Thread] Finished send_to_all", flush=True)
-        
-        # Run in a separate thread to avoid blocking the keyboard listener
-        thread = threading.Thread(target=send_to_all, daemon=True)
-        thread.start()
+        # We're on pynput's thread; the sockets belong to the server loop, so the
+        # broadcast is scheduled there rather than run on a loop of our own
+        self.connection_manager.broadcast_threadsafe(message)
         
         print("="*60 + "\n", flush=True)
     
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from cryptography.fernet import Fernet
 import base64
+import functools
 import logging
 
 logger = logging.getLogger("pointer.settings")
@@ -121,29 +122,13 @@ class SettingsManager:
             True if successful
         """
         try:
-            # Convert value to string
-            if isinstance(value, (dict, list)):
-                value_str = json.dumps(value)
-            else:
-                value_str = str(value)
-            
-            # Encrypt if it's a secret
-            if is_secret:
-                value_str = self._encrypt(value_str)
+            value_str = self._serialize(value, is_secret)
             
             with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT INTO settings (category, key, value, is_encrypted, is_secret, description)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(category, key) DO UPDATE SET
-                        value = excluded.value,
-                        is_encrypted = excluded.is_encrypted,
-                        is_secret = excluded.is_secret,
-                        description = excluded.description,
-                        updated_at = CURRENT_TIMESTAMP
-                """, (category, key, value_str, is_secret, is_secret, description))
+                conn.execute(self._UPSERT_SQL, (category, key, value_str, is_secret, is_secret, description))
                 conn.commit()
             
+            get_all_settings_cached.cache_clear()
             logger.info(f"Setting saved: {category}.{key}")
             return True
             
@@ -151,6 +136,66 @@ class SettingsManager:
             logger.error(f"Error saving setting {category}.{key}: {e}")
             return False
     
+    def set_many(
+        self,
+        category: str,
+        values: Dict[str, Any],
+        is_secret: bool = False,
+        descriptions: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Store several settings in one category in a single transaction.
+        
+        Args:
+            category: Category of the settings
+            values: Mapping of setting key to value
+            is_secret: If True, all values will be encrypted
+            descriptions: Optional mapping of setting key to description
+            
+        Returns:
+            True if successful (all settings written), False otherwise (none written)
+        """
+        descriptions = descriptions or {}
+        try:
+            rows = [
+                (category, key, self._serialize(value, is_secret), is_secret, is_secret, descriptions.get(key))
+                for key, value in values.items()
+            ]
+            
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(self._UPSERT_SQL, rows)
+                conn.commit()
+            
+            get_all_settings_cached.cache_clear()
+            logger.info(f"Settings saved: {category}.{{{', '.join(values)}}}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving settings in {category}: {e}")
+            return False
+    
+    _UPSERT_SQL = """
+        INSERT INTO settings (category, key, value, is_encrypted, is_secret, description)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(category, key) DO UPDATE SET
+            value = excluded.value,
+            is_encrypted = excluded.is_encrypted,
+            is_secret = excluded.is_secret,
+            description = excluded.description,
+            updated_at = CURRENT_TIMESTAMP
+    """
+    
+    def _serialize(self, value: Any, is_secret: bool) -> str:
+        """Convert a value to its stored string form, encrypting secrets."""
+        if isinstance(value, (dict, list)):
+            value_str = json.dumps(value)
+        else:
+            value_str = str(value)
+        
+        if is_secret:
+            value_str = self._encrypt(value_str)
+        return value_str
+    
     def get(
         self, 
         category: str, 
@@ -253,6 +298,16 @@ class SettingsManager:
             logger.error(f"Error retrieving category {category}: {e}")
             return {}
     
+    def is_ready(self) -> bool:
+        """Check that the settings database can be opened and queried."""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.error(f"Settings database not readable: {e}")
+            return False
+    
     def get_all_categories(self) -> List[str]:
         """Get list of all setting categories."""
         try:
@@ -324,6 +379,7 @@ class SettingsManager:
                     (category, key)
                 )
                 conn.commit()
+            get_all_settings_cached.cache_clear()
             logger.info(f"Setting deleted: {category}.{key}")
             return True
         except Exception as e:
@@ -336,6 +392,7 @@ class SettingsManager:
             with sqlite3.connect(self.db_path) as conn:
                 conn.execute("DELETE FROM settings WHERE category = ?", (category,))
                 conn.commit()
+            get_all_settings_cached.cache_clear()
             logger.info(f"Category deleted: {category}")
             return True
         except Exception as e:
@@ -414,3 +471,26 @@ def get_settings_manager() -> SettingsManager:
     if _settings_manager is None:
         _settings_manager = SettingsManager()
     return _settings_manager
+
+
+def is_settings_db_ready() -> bool:
+    """True if the global settings manager can be created and its database read."""
+    try:
+        return get_settings_manager().is_ready()
+    except Exception as e:
+        logger.warning(f"Could not open settings database: {e}")
+        return False
+
+
+@functools.lru_cache(maxsize=2)
+def get_all_settings_cached(
+    include_secrets: bool = False,
+    decrypt_secrets: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Cached get_all_settings() on the global settings manager.
+    
+    Cleared automatically whenever a setting is written or deleted.
+    The returned dict is shared - do not mutate it.
+    """
+    return get_settings_manager().get_all_settings(include_secrets, decrypt_secrets)